@@ -2,6 +2,16 @@ from fastapi import APIRouter
 from .booking import router as bookings_routers
 from .user import router as user_routers
 from .schedule import router as schedule_routers
+from .analytics import router as analytics_routers
+from .place import router as place_routers
+from .telegram import router as telegram_routers
+from .calendar_feed import router as calendar_feed_routers
+from .metrics import router as metrics_routers
+from .availability import router as availability_routers
+from .series import router as series_routers
+from .occupancy import router as occupancy_routers
+from .health import router as health_routers
+from .bootstrap import router as bootstrap_routers
 
 
 router = APIRouter()
@@ -17,4 +27,44 @@ router.include_router(
 
 router.include_router(
     schedule_routers,
-)
\ No newline at end of file
+)
+
+router.include_router(
+    analytics_routers,
+)
+
+router.include_router(
+    place_routers,
+)
+
+router.include_router(
+    telegram_routers,
+)
+
+router.include_router(
+    calendar_feed_routers,
+)
+
+router.include_router(
+    metrics_routers,
+)
+
+router.include_router(
+    availability_routers,
+)
+
+router.include_router(
+    series_routers,
+)
+
+router.include_router(
+    occupancy_routers,
+)
+
+router.include_router(
+    health_routers,
+)
+
+router.include_router(
+    bootstrap_routers,
+)
@@ -0,0 +1,62 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.schemas import analytics as analytics_schema
+from core.utils import verify_admin
+from crud.analytics import get_utilization_db, rebuild_utilization
+
+
+router = APIRouter(tags=["Analytics"])
+
+db = db_helper.session_getter
+
+
+@router.get("/analytics/utilization", response_model=analytics_schema.UtilizationResponse)
+async def get_utilization(
+    date_from: date,
+    date_to: date,
+    place: Optional[str] = None,
+    type: Optional[str] = None,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Помесячная загрузка площадок по месту и типу программы:
+    - человеко-дни по одобренным бронированиям
+    - пиковый день месяца и число людей в нём
+    - количество одобренных, отклонённых и ожидающих заявок, доля одобренных
+    Данные берутся из сводных таблиц, а не из bookings.
+    """
+    if not await verify_admin(user_id, db):
+        raise HTTPException(status_code=403, detail="Пользователь не является админом")
+
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Дата начала должна быть раньше даты окончания")
+
+    rows = await get_utilization_db(
+        db=db,
+        month_from=date_from,
+        month_to=date_to,
+        place=place,
+        type=type
+    )
+    return {"result": rows}
+
+
+@router.post("/analytics/utilization/rebuild", status_code=status.HTTP_204_NO_CONTENT)
+async def rebuild_utilization_rollups(
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Полностью пересчитывает сводные таблицы загрузки.
+    """
+    if not await verify_admin(user_id, db):
+        raise HTTPException(status_code=403, detail="Пользователь не является админом")
+
+    await rebuild_utilization(db)
+    return
@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.occupancy import OverlapIndex, find_free_windows
+from core.schemas import availability as availability_schema
+from crud.booking import get_approved_intervals_db
+from crud.place import get_place, get_venue_place_names
+
+
+router = APIRouter(tags=["Availability"])
+
+db = db_helper.session_getter
+
+# Насколько далеко вперед ищем свободные даты, если to не передан
+DEFAULT_SEARCH_DAYS = 365
+
+# Максимальная длина диапазона поиска: перебор идет по дням в цикле событий
+MAX_SEARCH_DAYS = 2 * 366
+
+
+@router.get("/availability", response_model=availability_schema.AvailabilityResponse)
+async def get_availability(
+    place: str,
+    days: int = Query(..., ge=1, le=366),
+    people: int = Query(..., ge=1),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Ближайшие даты, на которые площадку можно забронировать на days дней
+    для people человек. Вместимость проверяется так же, как при создании
+    бронирования, но по всем датам сразу и одним запросом к БД.
+    - from / to — границы поиска (по умолчанию от сегодня на год вперед,
+      не больше MAX_SEARCH_DAYS дней)
+    - limit — сколько вариантов вернуть
+    """
+    db_place = await get_place(db, place)
+    if db_place is None:
+        raise HTTPException(status_code=404, detail="Площадка не найдена")
+
+    date_from = date_from or datetime.now().date()
+    if date_to is None:
+        # Год вперед, но не дальше последней представимой даты
+        date_to = date_from + timedelta(days=min(DEFAULT_SEARCH_DAYS, (date.max - date_from).days))
+
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Дата начала должна быть раньше даты окончания")
+
+    if (date_to - date_from).days > MAX_SEARCH_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Диапазон поиска не может быть длиннее {MAX_SEARCH_DAYS} дней"
+        )
+
+    if db_place.capacity is not None and people > db_place.capacity:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Площадка вмещает максимум {db_place.capacity} человек"
+        )
+
+    intervals = []
+    if db_place.capacity is not None:
+        places = await get_venue_place_names(db, db_place.venue)
+        intervals = await get_approved_intervals_db(db, places, date_from, date_to)
+
+    windows = find_free_windows(
+        OverlapIndex(intervals),
+        capacity=db_place.capacity,
+        people=people,
+        days=days,
+        date_from=date_from,
+        date_to=date_to
+    )
+
+    return {
+        "place": db_place.name,
+        "venue": db_place.venue,
+        "capacity": db_place.capacity,
+        "result": [
+            {"start_date": start, "end_date": end, "remaining": remaining}
+            for start, end, remaining in islice(windows, limit)
+        ]
+    }
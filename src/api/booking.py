@@ -1,14 +1,17 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from core.consts import MAX_CAPACITY, PLACES_WITH_CAPACITY_CHECK
 from core.db_helper import db_helper
+from core.idempotency import request_fingerprint, run_idempotent
 from core.schemas import booking as booking_schema
-from core.utils import check_capacity, get_bookings_for_period, verify_admin
-from crud.booking import change_booking_status, create_booking_db, create_comment_db, delete_booking_db, get_booking_by_id_db, get_bookings_db, get_calendar_data_db, update_booking_db
+from core.serializers import booking_changes_response, booking_list_response, booking_response, calendar_days
+from core.utils import check_place_capacity, verify_admin
+from crud.booking import change_booking_status, create_booking_db, create_comment_db, delete_booking_db, get_booking_by_id_db, get_booking_changes_db, get_bookings_db, get_calendar_data_db, get_comments_db, update_booking_db
 from core.schemas import comment as comment_schema
+from crud.place import get_place
+from crud.waitlist import process_freed_capacity
 from telegram_bot.utils.utils import new_booking_notification
 
 
@@ -49,11 +52,42 @@ async def get_bookings(
         sort_order=sort_order.value
     )
 
-    return {"result": bookings}
+    return booking_list_response(bookings)
 
 
-@router.post("/bookings", response_model=booking_schema.Booking, status_code=status.HTTP_201_CREATED)
-async def create_booking(booking: booking_schema.BookingCreate, user_id: int = Header(...), db: AsyncSession = Depends(db)):
+@router.get("/bookings/changes", response_model=booking_schema.BookingChangesResponse)
+async def get_booking_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db),
+):
+    """
+    Лента изменений бронирований для синхронизации локальной копии.
+    - since — курсор (next_cursor предыдущего ответа); с since=0 отдаются все бронирования
+    - result — созданные и измененные бронирования, deleted — id удаленных
+    - has_more — есть следующая страница, ее нужно запросить с новым курсором
+    Админ получает изменения всех бронирований, пользователь — только своих.
+    """
+    is_admin = await verify_admin(user_id, db)
+
+    changed, deleted = await get_booking_changes_db(
+        db=db,
+        since=since,
+        limit=limit,
+        user_id=None if is_admin else user_id
+    )
+
+    return booking_changes_response(changed, deleted, since, limit)
+
+
+@router.post("/bookings", response_model=booking_schema.BookingDetail, status_code=status.HTTP_201_CREATED)
+async def create_booking(
+    booking: booking_schema.BookingCreate,
+    user_id: int = Header(...),
+    idempotency_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(db)
+):
     """
     Функция создания нового бронирования.
     Проверяет:
@@ -61,26 +95,35 @@ async def create_booking(booking: booking_schema.BookingCreate, user_id: int = H
     - Количество людей не превышает максимальную вместимость
     - Доступность площадки на выбранные даты
     - Если бронирование успешно, сохраняет его в базе данных и отправляет уведомление
+    С заголовком Idempotency-Key повтор запроса получает сохраненный ответ
+    без повторного создания бронирования и уведомления.
     """
+    return await run_idempotent(
+        idempotency_key,
+        user_id,
+        request_fingerprint("POST /bookings", booking.model_dump_json()),
+        lambda: _create_booking(booking, user_id, db)
+    )
+
+
+async def _create_booking(booking: booking_schema.BookingCreate, user_id: int, db: AsyncSession):
     if booking.start_date > booking.end_date:
         raise HTTPException(status_code=400, detail="Дата начала должна быть раньше даты окончания")
 
-    if booking.place in PLACES_WITH_CAPACITY_CHECK and booking.people_count > MAX_CAPACITY:
+    place = await get_place(db, booking.place)
+    if place is not None and place.capacity is not None and booking.people_count > place.capacity:
         raise HTTPException(
             status_code=400,
-            detail=f"Площадка вмещает максимум {MAX_CAPACITY} человек"
+            detail=f"Площадка вмещает максимум {place.capacity} человек"
         )
     
-    existing_bookings = await get_bookings_for_period(db, booking.start_date, booking.end_date)
+    can_share = await check_place_capacity(db, booking)
     
-    if existing_bookings:
-        can_share = await check_capacity(booking, existing_bookings)
-        
-        if not can_share:
-            raise HTTPException(
-                status_code=400, 
-                detail="Площадка уже забронирована на выбранные даты"
-            )
+    if not can_share:
+        raise HTTPException(
+            status_code=400, 
+            detail="Площадка уже забронирована на выбранные даты"
+        )
 
     db_booking = await create_booking_db(
         db=db,
@@ -110,19 +153,26 @@ async def create_booking(booking: booking_schema.BookingCreate, user_id: int = H
         f"<b>Доп. информация:</b> {db_booking.other_info or '-'}"
     )
 
-    await new_booking_notification(
-        booking_details=booking_details,
-        status=db_booking.status,
-        db=db
-    )
+    # Бронирование уже сохранено: ошибка Telegram не должна превращать
+    # ответ в 500, иначе клиент повторит запрос и создаст дубликат
+    try:
+        await new_booking_notification(
+            booking_details=booking_details,
+            status=db_booking.status,
+            db=db
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при отправке уведомления о бронировании: {e}")
 
-    return db_booking
+    # У нового бронирования комментариев еще нет
+    return booking_response(db_booking, status_code=status.HTTP_201_CREATED)
 
 
-@router.patch("/bookings/{booking_id}/approve", response_model=booking_schema.Booking)
+@router.patch("/bookings/{booking_id}/approve", response_model=booking_schema.BookingDetail)
 async def approve_booking(
     booking_id: int,
     user_id: int = Header(...),
+    idempotency_key: Optional[str] = Header(None),
     db: AsyncSession = Depends(db)
 ):
     """
@@ -132,7 +182,17 @@ async def approve_booking(
     - Существует ли бронирование с указанным ID
     - Статус бронирования должен быть "pending"
     - Проверяет доступность площадки при одобрении бронирования
+    Поддерживает заголовок Idempotency-Key.
     """
+    return await run_idempotent(
+        idempotency_key,
+        user_id,
+        request_fingerprint(f"PATCH /bookings/{booking_id}/approve"),
+        lambda: _approve_booking(booking_id, user_id, db)
+    )
+
+
+async def _approve_booking(booking_id: int, user_id: int, db: AsyncSession):
     check = await verify_admin(user_id, db)
     if not check:
         raise HTTPException(status_code=403, detail="Пользователь не является админом")
@@ -149,16 +209,13 @@ async def approve_booking(
         raise HTTPException(status_code=400, detail="Бронирование уже обработано")
 
     # Проверяем доступность площадки при одобрении бронирования
-    existing_bookings = await get_bookings_for_period(db, booking.start_date, booking.end_date)
+    can_share = await check_place_capacity(db, booking)
     
-    if existing_bookings:
-        can_share = await check_capacity(booking, existing_bookings)
-        
-        if not can_share:
-            raise HTTPException(
-                status_code=400, 
-                detail="Невозможно одобрить бронирование: конфликт с существующими бронированиями"
-            )
+    if not can_share:
+        raise HTTPException(
+            status_code=400, 
+            detail="Невозможно одобрить бронирование: конфликт с существующими бронированиями"
+        )
 
     booking = await change_booking_status(
         db=db,
@@ -166,20 +223,32 @@ async def approve_booking(
         status="approved"
     )    
 
-    return booking
+    comments = await get_comments_db(db=db, booking_id=booking.id, limit=None)
+    return booking_response(booking, comments)
 
 
-@router.patch("/bookings/{booking_id}/reject", response_model=booking_schema.Booking)
+@router.patch("/bookings/{booking_id}/reject", response_model=booking_schema.BookingDetail)
 async def reject_booking(
     booking_id: int,
     user_id: int = Header(...),
+    idempotency_key: Optional[str] = Header(None),
     db: AsyncSession = Depends(db)
 ):
     """
     Функция отклонения бронирования.
     Проверяет:
     - Является ли пользователь администратором
+    Поддерживает заголовок Idempotency-Key.
     """
+    return await run_idempotent(
+        idempotency_key,
+        user_id,
+        request_fingerprint(f"PATCH /bookings/{booking_id}/reject"),
+        lambda: _reject_booking(booking_id, user_id, db)
+    )
+
+
+async def _reject_booking(booking_id: int, user_id: int, db: AsyncSession):
     check = await verify_admin(user_id, db)
     if not check:
         raise HTTPException(status_code=403, detail="Пользователь не является админом")
@@ -195,17 +264,22 @@ async def reject_booking(
     if booking.status not in ("pending", "approved"):
         raise HTTPException(status_code=400, detail="Бронирование уже обработано")
 
+    prev_status = booking.status
     booking = await change_booking_status(
         db=db,
         booking=booking,
         status="rejected",
-        prev_status=booking.status
+        prev_status=prev_status
     )
 
-    return booking
+    if prev_status == "approved":
+        await process_freed_capacity(booking.place, booking.start_date, booking.end_date)
+
+    comments = await get_comments_db(db=db, booking_id=booking.id, limit=None)
+    return booking_response(booking, comments)
 
 
-@router.put("/bookings/{booking_id}", response_model=booking_schema.Booking)
+@router.put("/bookings/{booking_id}", response_model=booking_schema.BookingDetail)
 async def update_booking(
     booking_id: int,
     booking_update: booking_schema.BookingUpdate,
@@ -239,23 +313,21 @@ async def update_booking(
         booking.end_date = booking_update.end_date
     
     if booking_update.people_count:
-        if booking.place in PLACES_WITH_CAPACITY_CHECK and booking_update.people_count > MAX_CAPACITY:
+        place = await get_place(db, booking.place)
+        if place is not None and place.capacity is not None and booking_update.people_count > place.capacity:
             raise HTTPException(
                 status_code=400,
-                detail=f"Площадка вмещает максимум {MAX_CAPACITY} человек"
+                detail=f"Площадка вмещает максимум {place.capacity} человек"
             )
         booking.people_count = booking_update.people_count
 
-    existing_bookings = await get_bookings_for_period(db, booking.start_date, booking.end_date)
+    can_share = await check_place_capacity(db, booking, exclude_id=booking.id)
     
-    if existing_bookings:
-        can_share = await check_capacity(booking, existing_bookings)
-        
-        if not can_share:
-            raise HTTPException(
-                status_code=400, 
-                detail="Невозможно одобрить бронирование: конфликт с существующими бронированиями"
-            )
+    if not can_share:
+        raise HTTPException(
+            status_code=400, 
+            detail="Невозможно одобрить бронирование: конфликт с существующими бронированиями"
+        )
     
     booking = await update_booking_db(
         db=db,
@@ -263,7 +335,8 @@ async def update_booking(
         booking_update=booking_update
     )
 
-    return booking
+    comments = await get_comments_db(db=db, booking_id=booking.id, limit=None)
+    return booking_response(booking, comments)
 
 
 @router.delete("/bookings/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -295,11 +368,15 @@ async def delete_booking(
             detail="Нет прав на удаление этого бронирования"
         )
     
+    was_approved = booking.status == "approved"
     await delete_booking_db(
         db=db,
         booking=booking
     )
 
+    if was_approved:
+        await process_freed_capacity(booking.place, booking.start_date, booking.end_date)
+
     return
 
 
@@ -312,14 +389,36 @@ async def get_calendar_data(db: AsyncSession = Depends(db)):
     """
     calendar_data = await get_calendar_data_db(db)
 
-    return [
-        {
-            "date": date,
-            "total_people": data["total_people"],
-            "names": list(data["names"])
-        }
-        for date, data in sorted(calendar_data.items())
-    ]
+    return calendar_days(calendar_data)
+
+
+@router.get("/bookings/{booking_id}", response_model=booking_schema.BookingDetail)
+async def get_booking(
+    booking_id: int,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Бронирование со всеми комментариями. Доступно владельцу и администратору.
+    Объявлено после /bookings/calendar и /bookings/changes, чтобы не перехватывать их.
+    """
+    booking = await get_booking_by_id_db(
+        db=db,
+        booking_id=booking_id
+    )
+
+    if not booking:
+        raise HTTPException(status_code=404, detail="Бронирование не найдено")
+
+    is_admin = await verify_admin(user_id, db)
+    if not is_admin and booking.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Нет прав на просмотр бронирования"
+        )
+
+    comments = await get_comments_db(db=db, booking_id=booking_id, limit=None)
+    return booking_response(booking, comments)
 
 
 @router.post("/bookings/{booking_id}/comments", response_model=comment_schema.Comment)
@@ -353,3 +452,41 @@ async def add_comment(
     )
 
     return db_comment
+
+
+@router.get("/bookings/{booking_id}/comments", response_model=comment_schema.CommentListResponse)
+async def get_comments(
+    booking_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    after_id: Optional[int] = None,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Постраничное получение комментариев к бронированию.
+    Для следующей страницы передайте next_after_id из ответа в after_id.
+    """
+    booking = await get_booking_by_id_db(
+        db=db,
+        booking_id=booking_id
+    )
+
+    if not booking:
+        raise HTTPException(status_code=404, detail="Бронирование не найдено")
+
+    is_admin = await verify_admin(user_id, db)
+    if not is_admin and booking.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Нет прав на просмотр комментариев"
+        )
+
+    comments = await get_comments_db(
+        db=db,
+        booking_id=booking_id,
+        limit=limit,
+        after_id=after_id
+    )
+    next_after_id = comments[-1].id if len(comments) == limit else None
+
+    return {"result": comments, "next_after_id": next_after_id}
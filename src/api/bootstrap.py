@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.schemas import booking as booking_schema
+from core.schemas import bootstrap as bootstrap_schema
+from core.serializers import bootstrap_response
+from core.utils import verify_admin
+from crud.booking import get_bookings_db, get_calendar_data_db
+
+
+router = APIRouter(tags=["Bootstrap"])
+
+db = db_helper.session_getter
+
+
+async def _get_bookings(is_admin: bool, user_id: int) -> list:
+    async with db_helper.session_factory() as session:
+        return await get_bookings_db(
+            db=session,
+            is_admin=is_admin,
+            user_id=user_id,
+            sort_by=booking_schema.SortField.id.value,
+            sort_order=booking_schema.SortOrder.desc.value
+        )
+
+
+async def _get_calendar_data() -> dict:
+    async with db_helper.session_factory() as session:
+        return await get_calendar_data_db(session)
+
+
+@router.get("/bootstrap", response_model=bootstrap_schema.BootstrapResponse)
+async def get_bootstrap(
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Данные первого экрана мини-приложения одним запросом: признак админа
+    (как /users/check-admin), бронирования (как /bookings с сортировкой
+    по умолчанию) и календарь занятости (как /bookings/calendar).
+
+    Список админов обычно берется из кэша процесса, а бронирования
+    и календарь загружаются параллельно, каждый в своей сессии
+    и на своем соединении из пула.
+    """
+    is_admin = await verify_admin(user_id, db)
+
+    bookings, calendar_data = await asyncio.gather(
+        _get_bookings(is_admin, user_id),
+        _get_calendar_data()
+    )
+
+    return bootstrap_response(is_admin, bookings, calendar_data)
@@ -0,0 +1,149 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.ics import feed_cache, render_calendar
+from core.schemas import calendar_feed as calendar_feed_schema
+from crud.booking import get_feed_bookings_db
+from crud.calendar_feed import get_feed_token_db, get_feed_token_user_cached
+
+
+router = APIRouter(tags=["Calendar feeds"])
+
+db = db_helper.session_getter
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+
+def _not_modified(feed, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    if if_none_match is not None:
+        return feed.etag in (tag.strip() for tag in if_none_match.split(","))
+
+    if if_modified_since is not None:
+        try:
+            return feed.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+async def _feed_response(
+    db: AsyncSession,
+    key: tuple,
+    name: str,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    place: Optional[str] = None,
+    user_id: Optional[int] = None
+) -> Response:
+    """
+    Отдает ленту из кэша процесса; в БД идет только если расписание менялось
+    с момента последнего рендера.
+    """
+    feed = feed_cache.get(key)
+
+    if feed is None:
+        version = feed_cache.version
+        bookings = await get_feed_bookings_db(db, place=place, user_id=user_id)
+        body = render_calendar(name, bookings, datetime.now(timezone.utc))
+        feed = feed_cache.put(key, version, body, repr((name, [tuple(b) for b in bookings])).encode())
+
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": format_datetime(feed.last_modified, usegmt=True),
+        "Cache-Control": "max-age=300",
+    }
+
+    if _not_modified(feed, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=feed.body, media_type=ICS_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/calendar/feed.ics")
+async def get_calendar_feed(
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Лента iCalendar со всеми одобренными бронированиями.
+    """
+    return await _feed_response(
+        db, ("all",), "Расписание Таврида", if_none_match, if_modified_since
+    )
+
+
+@router.get("/calendar/places/{place}/feed.ics")
+async def get_place_calendar_feed(
+    place: str,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Лента iCalendar с одобренными бронированиями площадки.
+    """
+    return await _feed_response(
+        db, ("place", place), f"Расписание: {place}", if_none_match, if_modified_since,
+        place=place
+    )
+
+
+def _token_response(request: Request, token: str) -> dict:
+    return {
+        "token": token,
+        "url": str(request.url_for("get_user_calendar_feed", token=token)),
+    }
+
+
+@router.get("/calendar/feed-token", response_model=calendar_feed_schema.CalendarFeedTokenResponse)
+async def get_calendar_feed_token(
+    request: Request,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Ссылка на личную ленту пользователя. Токен в ссылке заменяет
+    заголовок user_id, которого календарные приложения не передают.
+    """
+    return _token_response(request, await get_feed_token_db(db, user_id))
+
+
+@router.post("/calendar/feed-token/rotate", response_model=calendar_feed_schema.CalendarFeedTokenResponse)
+async def rotate_calendar_feed_token(
+    request: Request,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Выдает новую ссылку на личную ленту; старая перестает работать.
+    """
+    return _token_response(request, await get_feed_token_db(db, user_id, rotate=True))
+
+
+@router.get("/calendar/personal/{token}/feed.ics")
+async def get_user_calendar_feed(
+    token: str,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Лента iCalendar с одобренными бронированиями пользователя по секретному токену.
+    """
+    # Токен и готовая лента берутся из кэша процесса: опрос подписки
+    # не ходит в БД, пока токен не заменили и расписание не менялось
+    user_id = await get_feed_token_user_cached(db, token)
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Лента не найдена")
+
+    return await _feed_response(
+        db, ("user", user_id), "Мои бронирования", if_none_match, if_modified_since,
+        user_id=user_id
+    )
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from core.lifecycle import lifecycle
+
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/health/live")
+async def get_liveness():
+    """
+    Процесс запущен и обрабатывает запросы.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def get_readiness():
+    """
+    Воркер готов принимать трафик: пул соединений и кэши прогреты, БД отвечает
+    и воркер не останавливается. Иначе 503 — балансировщик не должен слать сюда запросы.
+    """
+    if not await lifecycle.check():
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "not ready", "draining": lifecycle.draining}
+        )
+
+    return {"status": "ready"}
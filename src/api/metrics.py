@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.single_flight import get_single_flight_stats
+from core.utils import verify_admin
+
+
+router = APIRouter(tags=["Metrics"])
+
+db = db_helper.session_getter
+
+
+@router.get("/metrics/single-flight")
+async def get_single_flight_metrics(
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Счетчики объединения одинаковых запросов в текущем воркере:
+    calls — всего вызовов, executions — реальных запросов в БД,
+    coalesced — вызовов, дождавшихся результата уже выполнявшегося запроса.
+    """
+    if not await verify_admin(user_id, db):
+        raise HTTPException(status_code=403, detail="Пользователь не является админом")
+
+    return get_single_flight_stats()
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.schemas import occupancy as occupancy_schema
+from core.serializers import RawJSONResponse
+from crud.occupancy import get_occupancy_matrix
+from crud.place import get_place, get_places, get_venue_place_names
+
+
+router = APIRouter(tags=["Occupancy"])
+
+db = db_helper.session_getter
+
+# Самый длинный период для /occupancy/remaining
+MAX_REMAINING_DAYS = 731
+
+
+def numpy_response(content: dict) -> RawJSONResponse:
+    # orjson сериализует массивы NumPy напрямую, без перевода в списки Python
+    return RawJSONResponse(content=orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY))
+
+
+@router.get("/occupancy/heatmap", response_model=occupancy_schema.HeatmapResponse)
+async def get_occupancy_heatmap(
+    year: int = Query(..., ge=2000, le=2100),
+    place: Optional[str] = None,
+    db: AsyncSession = Depends(db)
+):
+    """
+    Годовая тепловая карта занятости: число людей в одобренных бронированиях
+    по дням года (people[0] — 1 января) для каждой площадки или только для place.
+    Для площадок с вместимостью возвращается и остаток мест по дням (remaining);
+    площадки одной локации делят вместимость, поэтому остаток считается по локации.
+    """
+    places = await get_places(db)
+    if place is not None:
+        if place not in places:
+            raise HTTPException(status_code=404, detail="Площадка не найдена")
+        places = {place: places[place]}
+
+    matrix = await get_occupancy_matrix(db, year)
+
+    result = []
+    for db_place in places.values():
+        people = matrix.people([db_place.name])
+        remaining = None
+        if db_place.capacity is not None:
+            venue_places = await get_venue_place_names(db, db_place.venue)
+            remaining = db_place.capacity - matrix.people(venue_places)
+
+        result.append({
+            "place": db_place.name,
+            "venue": db_place.venue,
+            "capacity": db_place.capacity,
+            "people": people,
+            "remaining": remaining,
+        })
+
+    return numpy_response({"year": year, "start_date": matrix.start, "result": result})
+
+
+@router.get("/occupancy/remaining", response_model=occupancy_schema.RemainingResponse)
+async def get_remaining_capacity(
+    place: str,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Остаток мест на площадке по дням периода [from, to] с учетом
+    всех площадок той же локации.
+    """
+    db_place = await get_place(db, place)
+    if db_place is None:
+        raise HTTPException(status_code=404, detail="Площадка не найдена")
+
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Дата начала должна быть раньше даты окончания")
+
+    if (date_to - date_from).days >= MAX_REMAINING_DAYS:
+        raise HTTPException(status_code=400, detail=f"Период не может быть длиннее {MAX_REMAINING_DAYS} дней")
+
+    venue_places = await get_venue_place_names(db, db_place.venue)
+
+    days = []
+    for year in range(date_from.year, date_to.year + 1):
+        matrix = await get_occupancy_matrix(db, year)
+        people = matrix.people(venue_places)
+
+        first = max(date_from, date(year, 1, 1))
+        last = min(date_to, date(year, 12, 31))
+        offset = (first - matrix.start).days
+        for i, count in enumerate(people[offset:offset + (last - first).days + 1].tolist()):
+            days.append({
+                "date": first + timedelta(days=i),
+                "people": count,
+                "remaining": None if db_place.capacity is None else db_place.capacity - count,
+            })
+
+    return numpy_response({
+        "place": db_place.name,
+        "venue": db_place.venue,
+        "capacity": db_place.capacity,
+        "result": days,
+    })
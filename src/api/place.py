@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.schemas import place as place_schema
+from core.utils import verify_admin
+from crud.place import get_places, upsert_place_db
+
+
+router = APIRouter(tags=["Places"])
+
+db = db_helper.session_getter
+
+
+@router.get("/places", response_model=place_schema.PlaceListResponse)
+async def get_places_list(db: AsyncSession = Depends(db)):
+    """
+    Возвращает список площадок и их вместимость.
+    """
+    places = await get_places(db)
+    return {"result": list(places.values())}
+
+
+@router.put("/places", response_model=place_schema.Place)
+async def upsert_place(
+    place: place_schema.PlaceBase,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Добавляет площадку или меняет её локацию и вместимость.
+    Пустая вместимость отключает проверку для площадки.
+    """
+    if not await verify_admin(user_id, db):
+        raise HTTPException(status_code=403, detail="Пользователь не является админом")
+
+    if place.capacity is not None and place.capacity <= 0:
+        raise HTTPException(status_code=400, detail="Вместимость должна быть положительной")
+
+    return await upsert_place_db(db, place)
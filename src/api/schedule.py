@@ -1,15 +1,19 @@
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, Header
-from sqlalchemy import select
+import asyncio
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import StreamingResponse
-import openpyxl
 from io import BytesIO
 
 from core.db_helper import db_helper
-from core.models import booking as booking_model
+from core.export import EXPORT_BATCH_SIZE, stream_csv, stream_ndjson, stream_parquet
+from core.schemas.schedule import ExportFormat
 from core.utils import verify_admin
-from telegram_bot.utils.utils import send_excel_file
+from core.export_cache import get_excel_cache
+from crud.booking import EXPORT_COLUMNS, get_export_bookings_db, get_export_query, get_schedule_version_db
+from telegram_bot.utils.utils import send_cached_excel_file, send_excel_file
 from fastapi.responses import JSONResponse
 
 
@@ -17,29 +21,58 @@ router = APIRouter(tags=["Schedule"])
 
 db = db_helper.session_getter
 
+def get_export_period(
+    date_from: Optional[date],
+    date_to: Optional[date]
+) -> Tuple[date, date]:
+    """
+    Период выгрузки. По умолчанию — 6 месяцев назад и 6 месяцев вперед от текущей даты.
+    """
+    today = datetime.now().date()
+    start_date = date_from or today - timedelta(days=180)
+    end_date = date_to or today + timedelta(days=180)
+
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Дата начала должна быть раньше даты окончания")
+
+    return start_date, end_date
+
+
+def get_parquet_schema():
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(),
+        "user_id": pa.int64(),
+        "start_date": pa.date32(),
+        "end_date": pa.date32(),
+        "people_count": pa.int32(),
+        "people_count_overall": pa.int32(),
+        "experts_count": pa.int32(),
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column in EXPORT_COLUMNS])
+
+
+async def iter_export_rows(start_date: date, end_date: date):
+    """
+    Читает бронирования серверным курсором пачками по EXPORT_BATCH_SIZE строк.
+    Сессия открывается здесь, а не через Depends: она должна жить, пока отдается ответ.
+    """
+    stmt = get_export_query(start_date, end_date).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async with db_helper.session_factory() as session:
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+
+def render_schedule_workbook(bookings) -> bytes:
+    """
+    Собирает книгу Excel с расписанием и возвращает ее содержимое.
+    """
+    # openpyxl импортируется только здесь: он тяжелый и нужен лишь для экспорта
+    import openpyxl
 
-@router.get("/export/excel/", response_class=StreamingResponse)
-async def export_schedule_to_excel(
-    user_id: int = Header(...),
-    session: AsyncSession = Depends(db)
-):
-    """Экспорт расписания в Excel файл."""
-    # Получаем текущую дату
-    current_date = datetime.now()
-    
-    # Рассчитываем даты для фильтрации (6 месяцев назад и 6 месяцев вперед)
-    start_date = current_date - timedelta(days=180)
-    end_date = current_date + timedelta(days=180)
-    
-    # Получаем все бронирования за указанный период
-    query = select(booking_model.Booking).where(
-        booking_model.Booking.start_date >= start_date,
-        booking_model.Booking.end_date <= end_date
-    ).order_by(booking_model.Booking.start_date, booking_model.Booking.end_date)
-    
-    result = await session.execute(query)
-    bookings = result.scalars().all()
-    
     # Создаем новый Excel файл
     wb = openpyxl.Workbook()
     ws = wb.active
@@ -111,13 +144,51 @@ async def export_schedule_to_excel(
     
     excel_file = BytesIO()
     wb.save(excel_file)
-    excel_file.seek(0)
+    return excel_file.getvalue()
 
-    await send_excel_file(
-        user_id=user_id,
-        file=excel_file,
-        filename=f"Расписание_{current_date.strftime('%d_%m_%Y')}.xlsx"
-    )
+
+@router.get("/export/excel/", response_class=StreamingResponse)
+async def export_schedule_to_excel(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    user_id: int = Header(...),
+    session: AsyncSession = Depends(db)
+):
+    """
+    Экспорт расписания в Excel файл.
+    Готовый файл хранится в кэше на диске по периоду и версии расписания:
+    пока бронирования не менялись, повторная выгрузка — это пересылка
+    по file_id Telegram или чтение файла, без запроса бронирований и рендера.
+    """
+    # Получаем текущую дату
+    current_date = datetime.now()
+    
+    start_date, end_date = get_export_period(date_from, date_to)
+
+    version = await get_schedule_version_db(session)
+    cache_key = f"{start_date.isoformat()}:{end_date.isoformat()}:{version}"
+    filename = f"Расписание_{current_date.strftime('%d_%m_%Y')}.xlsx"
+    # file_id в Telegram привязан и к имени файла, поэтому оно входит в ключ
+    content_key = hashlib.sha256(f"{filename}:{cache_key}".encode()).hexdigest()
+
+    if not await send_cached_excel_file(user_id, content_key):
+        # Файловые операции и рендер блокирующие, поэтому выполняются
+        # в потоке, чтобы не останавливать цикл событий воркера
+        excel_cache = get_excel_cache()
+        data = await asyncio.to_thread(excel_cache.get, cache_key)
+
+        if data is None:
+            # Получаем все бронирования за указанный период
+            bookings = await get_export_bookings_db(session, start_date, end_date)
+            data = await asyncio.to_thread(render_schedule_workbook, bookings)
+            await asyncio.to_thread(excel_cache.put, cache_key, data)
+
+        await send_excel_file(
+            user_id=user_id,
+            file=data,
+            filename=filename,
+            content_key=content_key
+        )
     
     return JSONResponse(
         content={"status": "success", "message": "Файл успешно отправлен в Telegram"},
@@ -131,3 +202,47 @@ async def export_schedule_to_excel(
     #         "Content-Disposition": f"attachment; filename=schedule_{current_date.strftime('%Y%m%d')}.xlsx"
     #     }
     # )
+
+
+@router.get("/export/{export_format}", response_class=StreamingResponse)
+async def export_schedule_stream(
+    export_format: ExportFormat,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    user_id: int = Header(...),
+    session: AsyncSession = Depends(db)
+):
+    """
+    Потоковая выгрузка расписания в CSV, NDJSON или Parquet.
+    Строки читаются из БД пачками и сразу отдаются клиенту,
+    поэтому память не зависит от объема выгрузки.
+    """
+    if not await verify_admin(user_id, session):
+        raise HTTPException(status_code=403, detail="Пользователь не является админом")
+
+    start_date, end_date = get_export_period(date_from, date_to)
+    rows = iter_export_rows(start_date, end_date)
+    filename = f"schedule_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.{export_format.value}"
+
+    if export_format == ExportFormat.csv:
+        content = stream_csv(EXPORT_COLUMNS, rows)
+        media_type = "text/csv; charset=utf-8"
+    elif export_format == ExportFormat.ndjson:
+        content = stream_ndjson(EXPORT_COLUMNS, rows)
+        media_type = "application/x-ndjson"
+    else:
+        try:
+            schema = get_parquet_schema()
+        except ImportError:
+            raise HTTPException(
+                status_code=501,
+                detail="Выгрузка в Parquet недоступна: не установлен pyarrow"
+            )
+        content = stream_parquet(schema, rows)
+        media_type = "application/vnd.apache.parquet"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
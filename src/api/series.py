@@ -0,0 +1,200 @@
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Header, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.recurrence import MAX_OCCURRENCES, expand_occurrences
+from core.schemas import booking as booking_schema
+from core.serializers import RawJSONResponse, booking_to_dict
+from core.utils import find_capacity_conflicts, verify_admin
+from crud.place import get_place
+from crud.series import change_series_status_db, create_series_db, get_series_bookings_db
+from crud.waitlist import process_freed_capacity
+
+
+router = APIRouter(tags=["Bookings"])
+
+db = db_helper.session_getter
+
+
+def series_response(series_id: int, bookings, status_code: int = 200) -> RawJSONResponse:
+    return RawJSONResponse(
+        content=orjson.dumps({
+            "series_id": series_id,
+            "result": [booking_to_dict(booking) for booking in bookings]
+        }),
+        status_code=status_code
+    )
+
+
+def conflicts_detail(conflicts) -> str:
+    dates = ", ".join(
+        f"{start.strftime('%d.%m.%Y')}—{end.strftime('%d.%m.%Y')}" for start, end in conflicts
+    )
+    return f"Площадка занята в даты: {dates}"
+
+
+@router.post(
+    "/bookings/series",
+    response_model=booking_schema.BookingSeriesResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_booking_series(
+    booking: booking_schema.BookingSeriesCreate,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Создание серии повторяющихся бронирований.
+    - recurrence.freq — weekly или monthly, recurrence.interval — каждые N недель/месяцев
+    - серия заканчивается после recurrence.count занятий или на recurrence.until
+    Вместимость всех занятий проверяется одним запросом; серия создается
+    целиком или не создается совсем, админам уходит одно уведомление.
+    """
+    if booking.start_date > booking.end_date:
+        raise HTTPException(status_code=400, detail="Дата начала должна быть раньше даты окончания")
+
+    recurrence = booking.recurrence
+    if recurrence.count is None and recurrence.until is None:
+        raise HTTPException(status_code=400, detail="Нужно указать count или until")
+
+    if recurrence.count is not None and recurrence.count > MAX_OCCURRENCES:
+        raise HTTPException(status_code=400, detail=f"В серии может быть не больше {MAX_OCCURRENCES} занятий")
+
+    occurrences = expand_occurrences(
+        booking.start_date.date(),
+        booking.end_date.date(),
+        freq=recurrence.freq.value,
+        interval=recurrence.interval,
+        count=recurrence.count,
+        until=recurrence.until
+    )
+    if not occurrences:
+        raise HTTPException(status_code=400, detail="По правилу повторения не получилось ни одного занятия")
+
+    if len(occurrences) > MAX_OCCURRENCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"До recurrence.until получается больше {MAX_OCCURRENCES} занятий: укажите более раннюю дату или count"
+        )
+
+    place = await get_place(db, booking.place)
+    if place is not None and place.capacity is not None and booking.people_count > place.capacity:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Площадка вмещает максимум {place.capacity} человек"
+        )
+
+    conflicts = await find_capacity_conflicts(
+        db,
+        booking.place,
+        [(start, end, booking.people_count) for start, end in occurrences]
+    )
+    if conflicts:
+        raise HTTPException(status_code=400, detail=conflicts_detail(conflicts))
+
+    series, bookings = await create_series_db(
+        db=db,
+        booking=booking,
+        occurrences=occurrences,
+        user_id=user_id
+    )
+
+    return series_response(series.id, bookings, status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/bookings/series/{series_id}", response_model=booking_schema.BookingSeriesResponse)
+async def get_booking_series(
+    series_id: int,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Все занятия серии (для админа или автора серии).
+    """
+    bookings = await get_series_bookings_db(db, series_id)
+    if not bookings:
+        raise HTTPException(status_code=404, detail="Серия не найдена")
+
+    if bookings[0].user_id != user_id and not await verify_admin(user_id, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Нет прав на просмотр этой серии"
+        )
+
+    return series_response(series_id, bookings)
+
+
+@router.patch("/bookings/series/{series_id}/approve", response_model=booking_schema.BookingSeriesResponse)
+async def approve_booking_series(
+    series_id: int,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Одобрение всех ожидающих занятий серии одной операцией.
+    Если хотя бы одно занятие не проходит по вместимости, не одобряется ни одно.
+    """
+    if not await verify_admin(user_id, db):
+        raise HTTPException(status_code=403, detail="Пользователь не является админом")
+
+    bookings = await get_series_bookings_db(db, series_id)
+    if not bookings:
+        raise HTTPException(status_code=404, detail="Серия не найдена")
+
+    pending = [booking for booking in bookings if booking.status == "pending"]
+    if not pending:
+        raise HTTPException(status_code=400, detail="Серия уже обработана")
+
+    conflicts = await find_capacity_conflicts(
+        db,
+        pending[0].place,
+        [(booking.start_date, booking.end_date, booking.people_count) for booking in pending]
+    )
+    if conflicts:
+        raise HTTPException(
+            status_code=400,
+            detail="Невозможно одобрить серию. " + conflicts_detail(conflicts)
+        )
+
+    await change_series_status_db(db, series_id, pending, "approved")
+
+    return series_response(series_id, bookings)
+
+
+@router.patch("/bookings/series/{series_id}/reject", response_model=booking_schema.BookingSeriesResponse)
+async def reject_booking_series(
+    series_id: int,
+    user_id: int = Header(...),
+    db: AsyncSession = Depends(db)
+):
+    """
+    Отклонение всех ожидающих и одобренных занятий серии одной операцией.
+    """
+    if not await verify_admin(user_id, db):
+        raise HTTPException(status_code=403, detail="Пользователь не является админом")
+
+    bookings = await get_series_bookings_db(db, series_id)
+    if not bookings:
+        raise HTTPException(status_code=404, detail="Серия не найдена")
+
+    active = [booking for booking in bookings if booking.status in ("pending", "approved")]
+    if not active:
+        raise HTTPException(status_code=400, detail="Серия уже обработана")
+
+    # Статусы меняются ниже, поэтому одобренные занятия запоминаются заранее
+    freed = [booking for booking in active if booking.status == "approved"]
+
+    await change_series_status_db(db, series_id, active, "rejected")
+
+    # Лист ожидания проверяется один раз на площадку за общий период
+    # освободившихся дат (занятие могли перенести на другую площадку)
+    for place in {booking.place for booking in freed}:
+        on_place = [booking for booking in freed if booking.place == place]
+        await process_freed_capacity(
+            place,
+            min(booking.start_date for booking in on_place),
+            max(booking.end_date for booking in on_place)
+        )
+
+    return series_response(series_id, bookings)
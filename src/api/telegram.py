@@ -0,0 +1,38 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from core.settings import get_settings
+from telegram_bot.config.config import get_bot
+from telegram_bot.dispatcher import process_update
+
+
+router = APIRouter(tags=["Telegram"])
+
+
+@router.post("/telegram/webhook", include_in_schema=False)
+async def telegram_webhook(
+    request: Request,
+    x_telegram_bot_api_secret_token: Optional[str] = Header(None)
+):
+    """
+    Принимает обновления Telegram в режиме webhook.
+    """
+    config = get_settings().telegram
+    if not config.webhook_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if not config.webhook_secret or not hmac.compare_digest(
+        x_telegram_bot_api_secret_token or "",
+        config.webhook_secret
+    ):
+        raise HTTPException(status_code=403, detail="Неверный секрет webhook")
+
+    from aiogram.types import Update
+
+    bot = get_bot()
+    update = Update.model_validate(await request.json(), context={"bot": bot})
+    process_update(bot, update)
+
+    return {"ok": True}
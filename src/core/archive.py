@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from loguru import logger
+
+from core.db_helper import db_helper
+from core.settings import ArchiveConfig
+from crud.archive import archive_bookings_batch
+
+
+class BookingArchiver:
+    """
+    Фоновая задача воркера: раз в config.interval секунд переносит
+    бронирования, закончившиеся раньше config.keep_days дней назад,
+    в bookings_archive (комментарии — в comments_archive).
+    Переносит пачками по config.batch_size, каждая пачка — отдельная
+    короткая транзакция, чтобы не держать блокировки на рабочей таблице.
+    """
+
+    def __init__(self, config: ArchiveConfig) -> None:
+        self._config = config
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def archive_once(self) -> int:
+        cutoff = datetime.now().date() - timedelta(days=self._config.keep_days)
+        total = 0
+
+        while True:
+            async with db_helper.session_factory() as session:
+                moved = await archive_bookings_batch(session, cutoff, self._config.batch_size)
+            total += moved
+            if moved < self._config.batch_size:
+                break
+
+        if total:
+            logger.info(f"Перенесено в архив бронирований: {total} (закончились до {cutoff})")
+        return total
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.archive_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка при архивировании бронирований: {e}")
+
+            await asyncio.sleep(self._config.interval)
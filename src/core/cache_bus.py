@@ -0,0 +1,133 @@
+import asyncio
+import inspect
+import json
+from collections import defaultdict
+from enum import Enum
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Union
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CacheEvent(str, Enum):
+    booking_changed = "booking_changed"
+    admins_changed = "admins_changed"
+    places_changed = "places_changed"
+    feed_token_changed = "feed_token_changed"
+
+
+Handler = Callable[[dict], Union[None, Awaitable[None]]]
+
+_handlers: Dict[CacheEvent, List[Handler]] = defaultdict(list)
+
+CHANNEL = "schedule_cache"
+
+# Как часто проверять живость LISTEN-соединения и пауза перед переподключением
+PING_INTERVAL = 30
+RECONNECT_DELAY = 5
+
+
+def register_handler(event: CacheEvent, handler: Handler) -> None:
+    """
+    Регистрирует обработчик события. Обработчик получает payload события;
+    после переподключения к БД он вызывается с пустым payload,
+    потому что события за время разрыва могли быть потеряны.
+    """
+    _handlers[event].append(handler)
+
+
+async def dispatch(event: CacheEvent, payload: dict) -> None:
+    for handler in _handlers[event]:
+        try:
+            result = handler(payload)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"Ошибка в обработчике события {event.value}: {e}")
+
+
+async def dispatch_all() -> None:
+    for event in list(_handlers):
+        await dispatch(event, {})
+
+
+async def publish(db: AsyncSession, event: CacheEvent, **payload) -> None:
+    """
+    Добавляет NOTIFY в текущую транзакцию сессии. Postgres доставит событие
+    всем воркерам (включая текущий) только после commit, при откате — не доставит.
+    """
+    message = json.dumps({"event": event.value, **payload}, default=str)
+    await db.execute(
+        text("SELECT pg_notify(:channel, :message)"),
+        {"channel": CHANNEL, "message": message}
+    )
+
+
+class CacheBusListener:
+    """
+    Одно LISTEN-соединение на воркер. Полученные события передаются
+    зарегистрированным обработчикам кэшей.
+    """
+
+    def __init__(self, url: str) -> None:
+        # asyncpg принимает обычный DSN без имени драйвера SQLAlchemy
+        self._dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def _on_notify(self, connection, pid, channel, message) -> None:
+        try:
+            payload = json.loads(message)
+            event = CacheEvent(payload.pop("event"))
+        except (ValueError, KeyError) as e:
+            logger.error(f"Некорректное событие кэша {message!r}: {e}")
+            return
+
+        task = asyncio.create_task(dispatch(event, payload))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self._dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notify)
+                logger.info("Шина инвалидации кэшей подключена")
+
+                await dispatch_all()
+
+                while not closed.is_set():
+                    try:
+                        await asyncio.wait_for(closed.wait(), timeout=PING_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1", timeout=PING_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Шина инвалидации кэшей отключена: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            await asyncio.sleep(RECONNECT_DELAY)
@@ -1,7 +0,0 @@
-MAX_CAPACITY = 400
-
-# Площадки, для которых проверяется max_capacity
-PLACES_WITH_CAPACITY_CHECK = [
-    "Офлайн Счастливцево",
-    "Офлайн Счастливцево и иная площадка"
-]
\ No newline at end of file
@@ -1,5 +1,7 @@
-from typing import AsyncGenerator
+import asyncio
+from typing import AsyncGenerator, Callable, Optional
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
@@ -7,45 +9,102 @@ from sqlalchemy.ext.asyncio import (
     AsyncSession,
 )
 
-from core.settings import settings
+from core.settings import DatabaseConfig, get_settings
 
 
 class DatabaseHelper:
-    def __init__(
-        self,
-        url: str,
-        echo: bool = False,
-        echo_pool: bool = False,
-        pool_size: int = 5,
-        max_overflow: int = 10,
-    ) -> None:
-        self.engine: AsyncEngine = create_async_engine(
-            url=url,
-            echo=echo,
-            echo_pool=echo_pool,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
+    """
+    Движок и фабрика сессий создаются при первом обращении (или явно
+    через setup() в lifespan), поэтому импорт модуля не открывает соединений
+    и не читает настройки.
+    """
+
+    def __init__(self, config_getter: Callable[[], DatabaseConfig]) -> None:
+        self._config_getter = config_getter
+        self._engine: Optional[AsyncEngine] = None
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+    def setup(self) -> None:
+        config = self._config_getter()
+        self._engine = create_async_engine(
+            url=str(config.url),
+            echo=config.echo,
+            echo_pool=config.echo_pool,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
             pool_pre_ping=True,
+            query_cache_size=config.query_cache_size,
+            connect_args={
+                "prepared_statement_cache_size": config.prepared_statement_cache_size,
+            },
         )
-        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            bind=self.engine,
+        self._session_factory = async_sessionmaker(
+            bind=self._engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
 
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self.setup()
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            self.setup()
+        return self._session_factory
+
+    async def warmup(self, connections: Optional[int] = None) -> int:
+        """
+        Открывает заранее до connections соединений пула (по умолчанию
+        warmup_connections из настроек) и возвращает их в пул, чтобы первые
+        запросы после запуска не ждали установки соединения.
+        Возвращает число открытых соединений.
+        """
+        config = self._config_getter()
+        if connections is None:
+            connections = config.warmup_connections
+        connections = max(0, min(connections, config.pool_size))
+
+        # Соединения держатся одновременно, иначе пул выдавал бы одно и то же
+        results = await asyncio.gather(
+            *(self.engine.connect().start() for _ in range(connections)),
+            return_exceptions=True
+        )
+        opened = [conn for conn in results if not isinstance(conn, BaseException)]
+        try:
+            for conn in opened:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            for conn in opened:
+                await conn.close()
+
+        errors = [e for e in results if isinstance(e, BaseException)]
+        if errors:
+            raise errors[0]
+
+        return len(opened)
+
+    async def ping(self) -> None:
+        """
+        Проверяет, что БД отвечает (на соединении из пула).
+        """
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
     async def dispose(self) -> None:
-        await self.engine.dispose()
+        if self._engine is None:
+            return
+        await self._engine.dispose()
+        self._engine = None
+        self._session_factory = None
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
 
 
-db_helper = DatabaseHelper(
-    url=str(settings.db.url),
-    echo=settings.db.echo,
-    echo_pool=settings.db.echo_pool,
-    pool_size=settings.db.pool_size,
-    max_overflow=settings.db.max_overflow,
-)
\ No newline at end of file
+db_helper = DatabaseHelper(lambda: get_settings().db)
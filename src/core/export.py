@@ -0,0 +1,83 @@
+import csv
+import io
+from typing import AsyncIterator, List, Sequence
+
+import orjson
+
+
+# Размер пачки строк, которую сервер отдает курсором за один раз
+EXPORT_BATCH_SIZE = 1000
+
+
+async def stream_csv(columns: List[str], partitions: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def stream_ndjson(columns: List[str], partitions: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield b"".join(
+            orjson.dumps(dict(zip(columns, row))) + b"\n"
+            for row in rows
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Поток для ParquetWriter: накапливает записанные байты до выдачи клиенту,
+    но помнит общую позицию, по которой считаются смещения в футере файла.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_parquet(schema, partitions: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """
+    Пишет каждую пачку строк отдельной row group, поэтому в памяти
+    держится только одна пачка. schema — pyarrow.Schema в порядке колонок.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in partitions:
+            batch = pa.Table.from_pylist(
+                [dict(zip(schema.names, row)) for row in rows],
+                schema=schema
+            )
+            writer.write_table(batch)
+            yield sink.pop()
+    finally:
+        writer.close()
+
+    yield sink.pop()
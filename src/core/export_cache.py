@@ -0,0 +1,96 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+
+class ExportFileCache:
+    """
+    Готовые файлы выгрузок на диске. Имя файла — хэш ключа (период выгрузки
+    и версия расписания), поэтому устаревшие файлы не перезаписываются,
+    а просто перестают запрашиваться и вытесняются по размеру: при превышении
+    max_bytes удаляются файлы, к которым дольше всего не обращались.
+    Каталог может быть общим для всех воркеров.
+    Методы работают с диском синхронно: из асинхронного кода их нужно
+    вызывать через asyncio.to_thread.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ".xlsx") -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._suffix = suffix
+
+    def _path(self, key: str) -> Path:
+        return self._directory / (hashlib.sha256(key.encode()).hexdigest() + self._suffix)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # Время изменения служит временем последнего обращения для LRU
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        # Одну выгрузку могут одновременно сохранять несколько запросов
+        # (и потоков одного процесса), поэтому у каждой записи свой файл
+        with tempfile.NamedTemporaryFile(
+            dir=self._directory, prefix=path.name + ".", suffix=".tmp", delete=False
+        ) as tmp:
+            tmp_path = Path(tmp.name)
+            try:
+                tmp.write(data)
+            except BaseException:
+                tmp.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self._directory.glob(f"*{self._suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            logger.debug(f"Удален файл выгрузки из кэша: {path.name}")
+
+
+_excel_cache: Optional[ExportFileCache] = None
+
+
+def get_excel_cache() -> ExportFileCache:
+    """
+    Кэш выгрузок Excel; путь и размер читаются из настроек при первом обращении.
+    """
+    global _excel_cache
+
+    if _excel_cache is None:
+        from core.settings import get_settings
+
+        config = get_settings().export_cache
+        _excel_cache = ExportFileCache(Path(config.path), config.max_mb * 1024 * 1024)
+
+    return _excel_cache
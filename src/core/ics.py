@@ -0,0 +1,143 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Tuple
+
+from core.cache_bus import CacheEvent, register_handler
+
+
+# Сколько готовых лент держать в памяти процесса (ленты по пользователям)
+FEED_CACHE_SIZE = 5000
+
+# Изменения бронирований приходят через шину инвалидации,
+# TTL страхует на случай её недоступности
+FEED_CACHE_TTL = 60
+
+
+@dataclass(frozen=True)
+class RenderedFeed:
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+
+def _escape(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """
+    Переносит строку по 75 байт (RFC 5545), не разрывая символы UTF-8.
+    """
+    parts = []
+    current = ""
+    size = 0
+    for char in line:
+        char_size = len(char.encode())
+        if size + char_size > 75:
+            parts.append(current)
+            # Строки продолжения начинаются с пробела
+            current = " "
+            size = 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n".join(parts)
+
+
+def render_calendar(name: str, bookings: Iterable, stamp: datetime) -> bytes:
+    """
+    Собирает календарь iCalendar из одобренных бронирований.
+    Ожидаются строки с полями id, start_date, end_date, name, theme, place, description.
+    """
+    dtstamp = stamp.strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Tavrida//Schedule//RU",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    for booking in bookings:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:booking-{booking.id}@schedule",
+            f"DTSTAMP:{dtstamp}",
+            f"DTSTART;VALUE=DATE:{booking.start_date.strftime('%Y%m%d')}",
+            # В iCalendar дата окончания события на весь день не включается
+            f"DTEND;VALUE=DATE:{(booking.end_date + timedelta(days=1)).strftime('%Y%m%d')}",
+            f"SUMMARY:{_escape(booking.name or booking.theme)}",
+            f"DESCRIPTION:{_escape(booking.description or booking.theme)}",
+            f"LOCATION:{_escape(booking.place)}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode()
+
+
+class FeedCache:
+    """
+    Готовые ленты в памяти процесса. Любое изменение бронирований
+    (событие booking_changed шины кэшей) повышает версию расписания,
+    и все ленты предыдущей версии считаются устаревшими.
+    Лента старше ttl секунд тоже перерисовывается.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._version = 0
+        self._feeds: "OrderedDict[Tuple, Tuple[int, float, RenderedFeed]]" = OrderedDict()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self) -> None:
+        self._version += 1
+        self._feeds.clear()
+
+    def get(self, key: Tuple) -> Optional[RenderedFeed]:
+        entry = self._feeds.get(key)
+        if entry is None or entry[0] != self._version:
+            return None
+        if time.monotonic() - entry[1] >= self._ttl:
+            del self._feeds[key]
+            return None
+        self._feeds.move_to_end(key)
+        return entry[2]
+
+    def put(self, key: Tuple, version: int, body: bytes, content: bytes) -> RenderedFeed:
+        """
+        content — данные, по которым считается ETag. Тело для этого не подходит:
+        в нем есть DTSTAMP, и ETag отличался бы между воркерами.
+        """
+        feed = RenderedFeed(
+            body=body,
+            etag='"' + hashlib.sha256(content).hexdigest()[:32] + '"',
+            last_modified=datetime.now(timezone.utc).replace(microsecond=0)
+        )
+        # Лента могла устареть, пока рендерилась — такую не сохраняем
+        if version == self._version:
+            self._feeds[key] = (version, time.monotonic(), feed)
+            self._feeds.move_to_end(key)
+            while len(self._feeds) > self._max_size:
+                self._feeds.popitem(last=False)
+        return feed
+
+
+feed_cache = FeedCache(FEED_CACHE_SIZE, FEED_CACHE_TTL)
+
+register_handler(CacheEvent.booking_changed, lambda payload: feed_cache.bump())
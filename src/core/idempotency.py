@@ -0,0 +1,157 @@
+import hashlib
+import time
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+import orjson
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.db_helper import db_helper
+from core.serializers import RawJSONResponse
+from core.settings import get_settings
+from crud.idempotency import (
+    claim_idempotency_key_db,
+    get_idempotency_key_db,
+    purge_idempotency_keys_db,
+    release_idempotency_key_db,
+    save_idempotent_response_db,
+)
+
+
+MAX_KEY_LENGTH = 255
+
+# Просроченные ключи удаляются попутно, не чаще раза в час на воркер
+PURGE_INTERVAL = 3600
+
+_last_purge: float = 0.0
+
+# Был ли commit в сессиях обработчика, выполняемого под ключом.
+# Вне run_idempotent здесь None и событие ничего не делает.
+_commits: ContextVar[Optional[Dict[str, bool]]] = ContextVar("idempotency_commits", default=None)
+
+
+@event.listens_for(Session, "after_commit")
+def _track_commit(session) -> None:
+    commits = _commits.get()
+    if commits is not None:
+        commits["committed"] = True
+
+
+def request_fingerprint(*parts: object) -> str:
+    """
+    Отпечаток запроса: метод, путь и тело. Повтор с тем же ключом,
+    но другим запросом отклоняется.
+    """
+    return hashlib.sha256(
+        "\n".join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+async def _purge_expired(ttl: timedelta) -> None:
+    global _last_purge
+
+    if time.monotonic() - _last_purge < PURGE_INTERVAL:
+        return
+    _last_purge = time.monotonic()
+
+    try:
+        async with db_helper.session_factory() as session:
+            purged = await purge_idempotency_keys_db(session, ttl)
+        if purged:
+            logger.info(f"Удалено просроченных ключей идемпотентности: {purged}")
+    except Exception as e:
+        logger.error(f"Не удалось удалить просроченные ключи идемпотентности: {e}")
+
+
+async def run_idempotent(
+    key: Optional[str],
+    user_id: int,
+    fingerprint: str,
+    handler: Callable[[], Awaitable[Response]]
+) -> Response:
+    """
+    Выполняет handler один раз на ключ Idempotency-Key пользователя.
+
+    Повтор с тем же ключом получает сохраненный ответ (с заголовком
+    Idempotent-Replayed: true) без повторных проверок, записи в БД
+    и уведомлений. Ответы с ошибкой клиента (HTTPException) тоже сохраняются.
+    Если запрос упал с ошибкой сервера до первого commit, ключ освобождается
+    и повтор выполнит запрос заново; если после — ключ остается занятым,
+    а повтор получит сохраненную ошибку. Без ключа handler просто выполняется.
+    """
+    if key is None:
+        return await handler()
+
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key должен быть непустой строкой не длиннее {MAX_KEY_LENGTH} символов"
+        )
+
+    config = get_settings().idempotency
+    ttl = timedelta(hours=config.ttl_hours)
+    await _purge_expired(ttl)
+
+    # Ключ хранится в отдельной сессии: handler сам делает commit в своей
+    async with db_helper.session_factory() as session:
+        claimed = await claim_idempotency_key_db(
+            session, user_id, key, fingerprint, ttl, timedelta(seconds=config.lock_timeout)
+        )
+        stored = None if claimed else await get_idempotency_key_db(session, user_id, key)
+
+    if not claimed:
+        if stored is not None and stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key уже использован для другого запроса"
+            )
+        if stored is None or stored.status_code is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Запрос с этим Idempotency-Key еще выполняется"
+            )
+
+        logger.info(f"Повтор запроса по Idempotency-Key пользователя {user_id}: отдан сохраненный ответ")
+        return RawJSONResponse(
+            content=stored.response,
+            status_code=stored.status_code,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    commits = {"committed": False}
+    token = _commits.set(commits)
+    try:
+        response = await handler()
+    except HTTPException as e:
+        await _save(user_id, key, e.status_code, orjson.dumps({"detail": e.detail}))
+        raise
+    except Exception:
+        if commits["committed"]:
+            # Изменение уже сохранено: повтор не должен выполнить его еще раз
+            await _save(user_id, key, status.HTTP_500_INTERNAL_SERVER_ERROR, orjson.dumps({
+                "detail": "Изменение сохранено, но запрос завершился ошибкой; повторять его не нужно"
+            }))
+        else:
+            async with db_helper.session_factory() as session:
+                await release_idempotency_key_db(session, user_id, key)
+        raise
+    finally:
+        _commits.reset(token)
+
+    await _save(user_id, key, response.status_code, response.body)
+    return response
+
+
+async def _save(user_id: int, key: str, status_code: int, body: bytes) -> None:
+    # Запрос уже выполнен, поэтому ошибка сохранения не должна превращать
+    # его в 500: повтор получит 409, пока ключ не освободится по lock_timeout
+    try:
+        async with db_helper.session_factory() as session:
+            await save_idempotent_response_db(session, user_id, key, status_code, body)
+    except Exception as e:
+        logger.error(f"Не удалось сохранить ответ по Idempotency-Key пользователя {user_id}: {e}")
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from datetime import date
+from typing import Optional
+
+import uvicorn
+from loguru import logger
+
+from core.db_helper import db_helper
+from crud.admin import get_admin_user_ids_cached
+from crud.booking import get_calendar_data_db
+from crud.occupancy import get_occupancy_matrix
+from crud.place import get_places
+
+
+class Lifecycle:
+    """
+    Состояние воркера для проверок готовности и плавной остановки.
+
+    Воркер готов принимать трафик после прогрева пула соединений и кэшей.
+    При остановке (DrainingServer) он сначала перестает считаться готовым,
+    продолжая принимать запросы, пока балансировщик не уберет его из ротации,
+    и только потом закрывает порт и дожидается запросов в обработке.
+    """
+
+    def __init__(self) -> None:
+        self.warmed = False
+        self.draining = False
+        self._warm_lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed and not self.draining
+
+    async def warm_up(self) -> bool:
+        """
+        Открывает заранее соединения пула и заполняет кэши процесса.
+        Ошибка прогрева не мешает запуску: воркер остается неготовым,
+        а прогрев повторится при следующей проверке готовности.
+        """
+        async with self._warm_lock:
+            if self.warmed:
+                return True
+
+            started = time.perf_counter()
+            try:
+                connections = await db_helper.warmup()
+                await warm_caches()
+            except Exception as e:
+                logger.error(f"Не удалось прогреть воркер: {e}")
+                return False
+
+            self.warmed = True
+            logger.info(
+                f"Воркер прогрет за {time.perf_counter() - started:.2f} с: "
+                f"открыто соединений {connections}"
+            )
+            return True
+
+    async def check(self) -> bool:
+        """
+        Проверка готовности: воркер прогрет, не останавливается и БД отвечает.
+        """
+        if self.draining:
+            return False
+
+        if not self.warmed and not await self.warm_up():
+            return False
+
+        try:
+            await db_helper.ping()
+        except Exception as e:
+            logger.warning(f"Проверка готовности: БД недоступна: {e}")
+            return False
+
+        return True
+
+
+async def warm_caches() -> None:
+    """
+    Заполняет кэши админов и площадок, матрицу занятости текущего года
+    и выполняет запрос календаря, чтобы он попал в кэш запросов SQLAlchemy
+    и подготовленных запросов asyncpg.
+    """
+    async with db_helper.session_factory() as session:
+        await get_admin_user_ids_cached(session)
+        await get_places(session)
+        await get_calendar_data_db(session)
+        await get_occupancy_matrix(session, date.today().year)
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    Сервер uvicorn с паузой перед остановкой.
+
+    uvicorn по сигналу сразу закрывает порт и ждет открытые соединения,
+    а lifespan узнает об остановке последним. Здесь по первому SIGTERM/SIGINT
+    воркер только помечается как останавливающийся: /health/ready отвечает 503,
+    но запросы еще принимаются. Через drain_delay секунд балансировщик уже
+    не шлет сюда трафик, и запускается обычная остановка uvicorn: порт
+    закрывается, запросы в обработке дожидаются timeout_graceful_shutdown.
+    Повторный сигнал останавливает сервер сразу.
+    """
+
+    def __init__(self, config: uvicorn.Config, lifecycle: Lifecycle, drain_delay: float) -> None:
+        super().__init__(config)
+        self.lifecycle = lifecycle
+        self.drain_delay = drain_delay
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def serve(self, sockets=None) -> None:
+        self._loop = asyncio.get_running_loop()
+        await super().serve(sockets)
+
+    def handle_exit(self, sig, frame) -> None:
+        if self.lifecycle.draining or self.drain_delay <= 0 or self._loop is None:
+            super().handle_exit(sig, frame)
+            return
+
+        self.lifecycle.draining = True
+        logger.info(f"Остановка: воркер не готов, порт закроется через {self.drain_delay} с")
+        # Обработчик сигнала — не корутина цикла, поэтому таймер ставится через threadsafe
+        self._loop.call_soon_threadsafe(
+            self._loop.call_later, self.drain_delay, self._exit_after_drain, sig, frame
+        )
+
+    def _exit_after_drain(self, sig, frame) -> None:
+        # Повторный сигнал мог уже запустить остановку
+        if not self.should_exit:
+            super().handle_exit(sig, frame)
+
+
+lifecycle = Lifecycle()
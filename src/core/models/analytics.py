@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, Text
+
+from core.models.models import Base
+
+
+class UtilizationDaily(Base):
+    """Занятость площадки по дням (только одобренные бронирования)."""
+    __tablename__ = "utilization_daily"
+
+    place = Column(Text, primary_key=True)
+    type = Column(Text, primary_key=True)
+    day = Column(Date, primary_key=True)
+    people = Column(Integer, nullable=False)
+
+
+class UtilizationMonthly(Base):
+    """Помесячная сводка загрузки площадки по типу программы."""
+    __tablename__ = "utilization_monthly"
+
+    place = Column(Text, primary_key=True)
+    type = Column(Text, primary_key=True)
+    month = Column(Date, primary_key=True)
+    person_days = Column(BigInteger, nullable=False, default=0)
+    peak_people = Column(Integer, nullable=False, default=0)
+    peak_day = Column(Date)
+    approved_count = Column(Integer, nullable=False, default=0)
+    rejected_count = Column(Integer, nullable=False, default=0)
+    pending_count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Date, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from core.models.models import Base
 
@@ -27,5 +27,44 @@ class Booking(Base):
     curator_position = Column(Text)
     curator_contact = Column(Text)
     other_info = Column(Text)
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Номер последнего изменения для ленты /bookings/changes (см. crud.booking.next_change_seq)
+    change_seq = Column(BigInteger, index=True)
+    updated_at = Column(DateTime(timezone=True))
+    series_id = Column(Integer, ForeignKey("booking_series.id", ondelete="SET NULL"), index=True)
     
-    comments = relationship("Comment", back_populates="booking", cascade="all, delete-orphan")
\ No newline at end of file
+    # Комментарии загружаются только явным запросом (см. crud.booking.get_comments_db)
+    comments = relationship(
+        "Comment",
+        back_populates="booking",
+        cascade="all, delete-orphan",
+        lazy="raise",
+        passive_deletes=True
+    )
+
+
+class BookingTombstone(Base):
+    """Запись об удаленном бронировании для ленты изменений."""
+    __tablename__ = "booking_tombstones"
+
+    booking_id = Column(Integer, primary_key=True)
+    user_id = Column(BigInteger, index=True)
+    change_seq = Column(BigInteger, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class BookingSeries(Base):
+    """Серия повторяющихся бронирований, созданная одним запросом."""
+    __tablename__ = "booking_series"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(BigInteger, index=True)
+    freq = Column(String(20), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    occurrences = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# Связь Booking.comments задана по имени: модель комментария регистрируется
+# вместе с бронированием, чтобы маппер настраивался при любом порядке импорта
+from core.models import comment as _comment  # noqa: E402,F401
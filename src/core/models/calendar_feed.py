@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+
+from core.models.models import Base
+
+
+class CalendarFeedToken(Base):
+    """Секретный токен личной ленты iCalendar пользователя."""
+    __tablename__ = "calendar_feed_tokens"
+
+    user_id = Column(BigInteger, primary_key=True)
+    token = Column(String(64), nullable=False, unique=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, LargeBinary, String
+
+from core.models.models import Base
+
+
+class IdempotencyKey(Base):
+    """Ключ идемпотентности запроса: отпечаток запроса и сохраненный ответ."""
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(BigInteger, primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # Пока запрос выполняется, status_code и response пустые
+    status_code = Column(Integer)
+    response = Column(LargeBinary)
+    created_at = Column(DateTime(timezone=True), nullable=False)
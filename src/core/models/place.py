@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Text
+
+from core.models.models import Base
+
+
+class Place(Base):
+    __tablename__ = "places"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(Text, unique=True, nullable=False)
+    # Площадки с одинаковым venue делят общую вместимость
+    venue = Column(Text, nullable=False)
+    # None — вместимость не проверяется
+    capacity = Column(Integer)
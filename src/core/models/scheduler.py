@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, DateTime, String
+
+from core.models.models import Base
+
+
+class JobRun(Base):
+    """Отметка о запуске ежедневной задачи планировщика (одна на задачу и день)."""
+    __tablename__ = "scheduler_runs"
+
+    job = Column(String(50), primary_key=True)
+    run_date = Column(Date, primary_key=True)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    # Пустое, пока задача выполняется
+    finished_at = Column(DateTime(timezone=True))
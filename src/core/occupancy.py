@@ -0,0 +1,172 @@
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from core.cache_bus import CacheEvent, register_handler
+
+
+# Изменения бронирований приходят через шину инвалидации,
+# TTL страхует на случай её недоступности
+OCCUPANCY_CACHE_TTL = 60
+
+
+class OverlapIndex:
+    """
+    Сумма людей в бронированиях, пересекающихся с периодом, за O(log n).
+
+    Считается так же, как в core.utils.check_capacity: складываются все
+    бронирования, пересекающиеся с периодом, а не максимум по дням.
+    Бронирование не пересекается с [start, end], если закончилось до start
+    или начинается после end; обе суммы берутся из префиксных сумм
+    по отсортированным датам окончания и начала.
+    """
+
+    def __init__(self, bookings: Iterable[Tuple[date, date, int]]) -> None:
+        bookings = list(bookings)
+
+        by_end = sorted((end, people) for _, end, people in bookings)
+        by_start = sorted((start, people) for start, _, people in bookings)
+
+        self._ends = [end for end, _ in by_end]
+        self._starts = [start for start, _ in by_start]
+        self._ended_sums = [0, *accumulate(people for _, people in by_end)]
+        self._started_sums = [0, *accumulate(people for _, people in by_start)]
+        self._total = self._ended_sums[-1]
+
+    def overlapping_people(self, start: date, end: date) -> int:
+        ended_before = self._ended_sums[bisect_left(self._ends, start)]
+        started_after = self._total - self._started_sums[bisect_right(self._starts, end)]
+        return self._total - ended_before - started_after
+
+
+def find_free_windows(
+    index: OverlapIndex,
+    capacity: Optional[int],
+    people: int,
+    days: int,
+    date_from: date,
+    date_to: date,
+) -> Iterator[Tuple[date, date, Optional[int]]]:
+    """
+    Перебирает по возрастанию даты начала периодов из days дней внутри
+    [date_from, date_to], на которые можно забронировать people человек.
+    Возвращает (начало, конец, сколько мест останется); для площадки
+    без ограничения вместимости остаток — None.
+    """
+    # Период не помещается в диапазон; заодно защищает от выхода за date.min
+    if (date_to - date_from).days + 1 < days:
+        return
+
+    start = date_from
+    last_start = date_to - timedelta(days=days - 1)
+
+    while True:
+        end = start + timedelta(days=days - 1)
+
+        if capacity is None:
+            yield start, end, None
+        else:
+            remaining = capacity - index.overlapping_people(start, end) - people
+            if remaining >= 0:
+                yield start, end, remaining
+
+        # Сравнение до сдвига: last_start может быть date.max
+        if start >= last_start:
+            return
+        start += timedelta(days=1)
+
+
+class OccupancyMatrix:
+    """
+    Матрица "площадка × день" с числом людей в одобренных бронированиях
+    за один год. Строится векторно: для каждого бронирования +people в день
+    начала и -people на следующий день после окончания (разностный массив),
+    затем накопленная сумма по дням.
+    """
+
+    def __init__(self, year: int, bookings: Iterable[Tuple[str, date, date, int]]) -> None:
+        import numpy as np
+
+        bookings = list(bookings)
+        self.year = year
+        self.start = date(year, 1, 1)
+        self.days = (date(year + 1, 1, 1) - self.start).days
+        self.places: List[str] = sorted({place for place, _, _, _ in bookings})
+        self._place_index = {place: i for i, place in enumerate(self.places)}
+
+        rows, starts, ends, people = [], [], [], []
+        for place, start_date, end_date, count in bookings:
+            rows.append(self._place_index[place])
+            starts.append((start_date - self.start).days)
+            ends.append((end_date - self.start).days + 1)
+            people.append(count)
+
+        rows = np.asarray(rows, dtype=np.intp)
+        starts = np.clip(np.asarray(starts, dtype=np.intp), 0, self.days)
+        ends = np.clip(np.asarray(ends, dtype=np.intp), 0, self.days)
+        people = np.asarray(people, dtype=np.int64)
+
+        diff = np.zeros((len(self.places), self.days + 1), dtype=np.int64)
+        np.add.at(diff, (rows, starts), people)
+        np.add.at(diff, (rows, ends), -people)
+        self._matrix = np.cumsum(diff, axis=1)[:, :self.days]
+
+    def people(self, places: Iterable[str]):
+        """
+        Люди по дням года, суммарно по переданным площадкам (массив длиной days).
+        """
+        import numpy as np
+
+        rows = [self._place_index[place] for place in places if place in self._place_index]
+        if not rows:
+            return np.zeros(self.days, dtype=np.int64)
+        return self._matrix[rows].sum(axis=0)
+
+
+class OccupancyCache:
+    """
+    Матрицы занятости по годам в памяти процесса. Любое изменение
+    бронирований (событие booking_changed шины кэшей) сбрасывает все матрицы.
+    Матрица старше ttl секунд тоже строится заново.
+    """
+
+    def __init__(self, max_years: int, ttl: float) -> None:
+        self._max_years = max_years
+        self._ttl = ttl
+        self._version = 0
+        self._matrices: "OrderedDict[int, Tuple[float, OccupancyMatrix]]" = OrderedDict()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self) -> None:
+        self._version += 1
+        self._matrices.clear()
+
+    def get(self, year: int) -> Optional[OccupancyMatrix]:
+        entry = self._matrices.get(year)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= self._ttl:
+            del self._matrices[year]
+            return None
+        self._matrices.move_to_end(year)
+        return entry[1]
+
+    def put(self, version: int, matrix: OccupancyMatrix) -> None:
+        # Матрица могла устареть, пока строилась — такую не сохраняем
+        if version != self._version:
+            return
+        self._matrices[matrix.year] = (time.monotonic(), matrix)
+        self._matrices.move_to_end(matrix.year)
+        while len(self._matrices) > self._max_years:
+            self._matrices.popitem(last=False)
+
+
+occupancy_cache = OccupancyCache(max_years=5, ttl=OCCUPANCY_CACHE_TTL)
+
+register_handler(CacheEvent.booking_changed, lambda payload: occupancy_cache.bump())
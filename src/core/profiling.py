@@ -0,0 +1,171 @@
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from loguru import logger
+
+from core.settings import ProfilingConfig
+
+
+# Время в БД и в Telegram API за текущий запрос, секунды.
+# Пока профилирование выключено, здесь None и счетчики ничего не делают.
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("profiling_timings", default=None)
+
+_db_events_installed = False
+
+
+def add_timing(kind: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings[kind] = timings.get(kind, 0.0) + seconds
+
+
+def install_db_timing() -> None:
+    """
+    Считает время выполнения SQL-запросов. Событие вешается на класс Engine,
+    поэтому действует на все движки, в том числе созданные позже.
+    """
+    global _db_events_installed
+    if _db_events_installed:
+        return
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["profiling_started"].pop()
+        add_timing("db", time.perf_counter() - started)
+
+    _db_events_installed = True
+
+
+class TelegramTimingMiddleware:
+    """
+    Middleware сессии aiogram: считает время запросов к Telegram Bot API.
+    Подключается через bot.session.middleware(...).
+    """
+
+    async def __call__(self, make_request, bot, method):
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            add_timing("telegram", time.perf_counter() - started)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI-middleware выборочного профилирования запросов.
+
+    Запрос профилируется, если админ передал заголовок X-Profile: 1
+    (вместе с обычным user_id) или если он попал в долю sample_rate.
+    Для такого запроса в лог пишется разбивка времени на БД, Telegram
+    и Python, она же отдается в заголовке Server-Timing. Если установлен
+    pyinstrument, рядом сохраняется профиль в формате speedscope.
+
+    Middleware добавляется в приложение только при CONFIG__PROFILING__ENABLED=true,
+    поэтому без него на запросы не тратится ничего.
+    """
+
+    def __init__(self, app, config: ProfilingConfig) -> None:
+        self.app = app
+        self.config = config
+        self.output_dir = Path(config.output_dir)
+
+    async def _is_requested(self, scope) -> bool:
+        if self.config.sample_rate and random.random() < self.config.sample_rate:
+            return True
+
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile") != b"1":
+            return False
+
+        try:
+            user_id = int(headers.get(b"user-id", b""))
+        except ValueError:
+            return False
+
+        # Импорт здесь: core.utils тянет за собой crud
+        from core.db_helper import db_helper
+        from core.utils import verify_admin
+
+        async with db_helper.session_factory() as session:
+            return await verify_admin(user_id, session)
+
+    def _start_profiler(self):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            return None
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        return profiler
+
+    def _save_profile(self, profiler, scope) -> Optional[Path]:
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        name = scope["path"].strip("/").replace("/", "_") or "root"
+        path = self.output_dir / (
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{scope['method']}_{name}.speedscope.json"
+        )
+        path.write_text(profiler.output(renderer=SpeedscopeRenderer()), encoding="utf-8")
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await self._is_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+
+        def server_timing() -> str:
+            total = time.perf_counter() - started
+            db = timings.get("db", 0.0)
+            telegram = timings.get("telegram", 0.0)
+            python = max(total - db - telegram, 0.0)
+            return (
+                f"db;dur={db * 1000:.1f}, telegram;dur={telegram * 1000:.1f}, "
+                f"python;dur={python * 1000:.1f}, total;dur={total * 1000:.1f}"
+            )
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = self._start_profiler()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            summary = server_timing()
+
+            profile_path = None
+            if profiler is not None:
+                profiler.stop()
+                try:
+                    # Рендер и запись большого профиля блокирующие: в потоке,
+                    # чтобы не задерживать остальные запросы воркера
+                    profile_path = await asyncio.to_thread(self._save_profile, profiler, scope)
+                except Exception as e:
+                    logger.error(f"Не удалось сохранить профиль запроса: {e}")
+
+            logger.info(
+                f"Профиль {scope['method']} {scope['path']}: {summary}"
+                + (f", файл {profile_path}" if profile_path else "")
+            )
@@ -0,0 +1,52 @@
+import calendar
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+
+# Ограничение на число занятий в одной серии
+MAX_OCCURRENCES = 104
+
+
+def add_months(d: date, months: int) -> date:
+    """
+    Сдвигает дату на months месяцев; 31-е число в коротком месяце
+    становится последним днем месяца.
+    """
+    month_index = d.month - 1 + months
+    year = d.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(d.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def expand_occurrences(
+    start_date: date,
+    end_date: date,
+    freq: str,
+    interval: int = 1,
+    count: Optional[int] = None,
+    until: Optional[date] = None
+) -> List[Tuple[date, date]]:
+    """
+    Разворачивает правило повторения в список (начало, конец) занятий.
+    Первое занятие — исходные даты; серия заканчивается после count занятий
+    или на последнем занятии, начинающемся не позже until.
+    Без count разворачивается не больше MAX_OCCURRENCES + 1 занятий: лишнее
+    занятие показывает вызывающему, что until дает слишком длинную серию.
+    """
+    duration = end_date - start_date
+    limit = count if count is not None else MAX_OCCURRENCES + 1
+
+    occurrences = []
+    for n in range(limit):
+        if freq == "weekly":
+            start = start_date + timedelta(weeks=interval * n)
+        else:
+            start = add_months(start_date, interval * n)
+
+        if until is not None and start > until:
+            break
+
+        occurrences.append((start, start + duration))
+
+    return occurrences
@@ -0,0 +1,21 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class UtilizationMonth(BaseModel):
+    month: date
+    place: Optional[str] = None
+    type: Optional[str] = None
+    person_days: int
+    peak_people: int
+    peak_day: Optional[date] = None
+    approved_count: int
+    rejected_count: int
+    pending_count: int
+    approval_rate: Optional[float] = None
+
+
+class UtilizationResponse(BaseModel):
+    result: List[UtilizationMonth]
@@ -0,0 +1,17 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class AvailableWindow(BaseModel):
+    start_date: date
+    end_date: date
+    remaining: Optional[int] = None
+
+
+class AvailabilityResponse(BaseModel):
+    place: str
+    venue: str
+    capacity: Optional[int] = None
+    result: List[AvailableWindow]
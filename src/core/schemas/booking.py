@@ -1,8 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import date, datetime
-from core.schemas.comment import Comment
 from enum import Enum
+from core.schemas.comment import CommentRead
 
 class SortField(str, Enum):
     id = "id"
@@ -80,12 +80,17 @@ class Booking(BaseModel):
     curator_position: Optional[str] = None
     curator_contact: Optional[str] = None
     other_info: Optional[str] = None
-    comments: List[Comment] = []
+    comment_count: int = 0
+    series_id: Optional[int] = None
     
     model_config = {
         "from_attributes": True
     }
 
+class BookingDetail(Booking):
+    # Только в ответах по одному бронированию; в списках — comment_count
+    comments: List[CommentRead] = []
+
 class BookingListRequest(BaseModel):
     admin_id: Optional[int] = None
 
@@ -94,6 +99,35 @@ class BookingListResponse(BaseModel):
     result: List[Booking]
 
 
+class RecurrenceFreq(str, Enum):
+    weekly = "weekly"
+    monthly = "monthly"
+
+
+class Recurrence(BaseModel):
+    freq: RecurrenceFreq
+    interval: int = Field(1, ge=1, le=12)
+    # Нужно указать count или until (или оба — серия закончится раньше)
+    count: Optional[int] = Field(None, ge=1)
+    until: Optional[date] = None
+
+
+class BookingSeriesCreate(BookingCreate):
+    recurrence: Recurrence
+
+
+class BookingSeriesResponse(BaseModel):
+    series_id: int
+    result: List[Booking]
+
+
+class BookingChangesResponse(BaseModel):
+    result: List[Booking]
+    deleted: List[int]
+    next_cursor: int
+    has_more: bool
+
+
 class CalendarDay(BaseModel):
     date: str
     total_people: int
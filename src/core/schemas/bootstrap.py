@@ -0,0 +1,11 @@
+from typing import List
+
+from pydantic import BaseModel
+
+from core.schemas.booking import Booking, CalendarDay
+
+
+class BootstrapResponse(BaseModel):
+    is_admin: bool
+    bookings: List[Booking]
+    calendar: List[CalendarDay]
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class CalendarFeedTokenResponse(BaseModel):
+    token: str
+    url: str
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 class CommentBase(BaseModel):
@@ -8,3 +10,15 @@ class CommentBase(BaseModel):
 class Comment(CommentBase):
     class Config:
         from_attributes = True
+
+
+class CommentRead(CommentBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class CommentListResponse(BaseModel):
+    result: List[CommentRead]
+    next_after_id: Optional[int] = None
@@ -0,0 +1,31 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class PlaceHeatmap(BaseModel):
+    place: str
+    venue: str
+    capacity: Optional[int] = None
+    people: List[int]
+    remaining: Optional[List[int]] = None
+
+
+class HeatmapResponse(BaseModel):
+    year: int
+    start_date: date
+    result: List[PlaceHeatmap]
+
+
+class RemainingDay(BaseModel):
+    date: date
+    people: int
+    remaining: Optional[int] = None
+
+
+class RemainingResponse(BaseModel):
+    place: str
+    venue: str
+    capacity: Optional[int] = None
+    result: List[RemainingDay]
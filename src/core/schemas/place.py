@@ -0,0 +1,19 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class PlaceBase(BaseModel):
+    name: str
+    venue: str
+    capacity: Optional[int] = None
+
+
+class Place(PlaceBase):
+    model_config = {
+        "from_attributes": True
+    }
+
+
+class PlaceListResponse(BaseModel):
+    result: List[Place]
@@ -0,0 +1,105 @@
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi.responses import Response
+
+from core.models import booking as booking_model
+from core.models import comment as comment_model
+from core.schemas import booking as booking_schema
+
+
+# Поля ответа берутся из схемы, чтобы быстрый путь не разошелся с OpenAPI
+BOOKING_FIELDS = tuple(booking_schema.Booking.model_fields)
+
+# Колонки bookings в порядке BOOKING_FIELDS — для select(*BOOKING_COLUMNS)
+BOOKING_COLUMNS = tuple(getattr(booking_model.Booking, field) for field in BOOKING_FIELDS)
+
+
+class RawJSONResponse(Response):
+    """
+    Ответ с уже сериализованным JSON. FastAPI не прогоняет его через
+    response_model, поэтому валидация и сериализация выполняются один раз.
+    """
+    media_type = "application/json"
+
+
+def booking_row_to_dict(row: Sequence[Any]) -> dict:
+    """
+    Строка из select(*BOOKING_COLUMNS) -> словарь ответа.
+    """
+    return dict(zip(BOOKING_FIELDS, row))
+
+
+def booking_to_dict(booking: booking_model.Booking) -> dict:
+    """
+    ORM-объект бронирования -> словарь ответа.
+    """
+    return {field: getattr(booking, field) for field in BOOKING_FIELDS}
+
+
+def booking_response(
+    booking: booking_model.Booking,
+    comments: Sequence[comment_model.Comment] = (),
+    status_code: int = 200
+) -> RawJSONResponse:
+    """
+    Ответ по одному бронированию (схема BookingDetail) вместе с комментариями.
+    """
+    content = booking_to_dict(booking)
+    content["comments"] = [
+        {"id": c.id, "comment": c.comment, "booking_id": c.booking_id}
+        for c in comments
+    ]
+    return RawJSONResponse(content=orjson.dumps(content), status_code=status_code)
+
+
+def booking_list_response(rows: Iterable[Sequence[Any]]) -> RawJSONResponse:
+    return RawJSONResponse(
+        content=orjson.dumps({"result": [booking_row_to_dict(row) for row in rows]})
+    )
+
+
+def calendar_days(calendar_data: dict) -> list:
+    """
+    Данные get_calendar_data_db -> список дней календаря по возрастанию даты.
+    """
+    return [
+        {
+            "date": date,
+            "total_people": data["total_people"],
+            "names": list(data["names"])
+        }
+        for date, data in sorted(calendar_data.items())
+    ]
+
+
+def bootstrap_response(is_admin: bool, rows: Iterable[Sequence[Any]], calendar_data: dict) -> RawJSONResponse:
+    return RawJSONResponse(content=orjson.dumps({
+        "is_admin": is_admin,
+        "bookings": [booking_row_to_dict(row) for row in rows],
+        "calendar": calendar_days(calendar_data),
+    }))
+
+
+def booking_changes_response(changed: Sequence, deleted: Sequence, since: int, limit: int) -> RawJSONResponse:
+    """
+    changed — строки BOOKING_COLUMNS + change_seq, deleted — пары (booking_id, change_seq).
+    Оба списка упорядочены по change_seq; курсор сдвигается на последнее
+    отданное изменение, так что ничего между страницами не теряется.
+    """
+    events = sorted(
+        [(row[-1], "changed", booking_row_to_dict(row[:-1])) for row in changed]
+        + [(row[1], "deleted", row[0]) for row in deleted],
+        key=lambda event: event[0]
+    )
+    # Еще есть изменения, если общий список обрезан или любой из запросов
+    # уперся в limit (в БД могут быть строки дальше)
+    has_more = len(events) > limit or len(changed) == limit or len(deleted) == limit
+    events = events[:limit]
+
+    return RawJSONResponse(content=orjson.dumps({
+        "result": [payload for _, kind, payload in events if kind == "changed"],
+        "deleted": [payload for _, kind, payload in events if kind == "deleted"],
+        "next_cursor": events[-1][0] if events else since,
+        "has_more": has_more,
+    }))
@@ -1,14 +1,20 @@
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from pydantic import BaseModel, Field, model_validator
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from typing import Any
+from typing import Any, Literal, Optional
 
 
 class RunConfig(BaseModel):
     host: str = "0.0.0.0"
     port: int = 8080
+    # Перезапуск при изменении кода (для разработки); без него работает DrainingServer
+    reload: bool = False
+    # Сколько секунд после сигнала остановки воркер отвечает 503 на /health/ready,
+    # продолжая принимать запросы, прежде чем закрыть порт
+    drain_delay: float = 5.0
+    # Сколько секунд после закрытия порта ждать завершения запросов в обработке
+    drain_timeout: float = 30.0
 
 
 class ApiV1Prefix(BaseModel):
@@ -27,6 +33,12 @@ class DatabaseConfig(BaseModel):
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    # Кэш скомпилированных SQLAlchemy-запросов (на движок) и кэш
+    # подготовленных запросов asyncpg (на соединение)
+    query_cache_size: int = 1200
+    prepared_statement_cache_size: int = 500
+    # Сколько соединений пула открыть заранее при запуске (не больше pool_size)
+    warmup_connections: int = 10
     engine: Any = Field(default=None, exclude=True)
     SessionLocal: Any = Field(default=None, exclude=True)
     db_client: Any = Field(default=None, exclude=True)
@@ -40,6 +52,76 @@ class DatabaseConfig(BaseModel):
     }
 
 
+class CacheBusConfig(BaseModel):
+    # LISTEN/NOTIFY-шина инвалидации кэшей между воркерами
+    enabled: bool = True
+
+
+class ArchiveConfig(BaseModel):
+    # Перенос старых бронирований в bookings_archive. Выключен по умолчанию:
+    # перенесенные бронирования пропадают из API, включается явно
+    enabled: bool = False
+    # Бронирования, закончившиеся раньше, чем keep_days дней назад, уходят в архив
+    keep_days: int = 730
+    batch_size: int = 500
+    # Интервал между запусками, секунды
+    interval: int = 3600
+
+
+class ExportCacheConfig(BaseModel):
+    # Кэш готовых выгрузок Excel на диске (core/export_cache.py)
+    path: str = "export_cache"
+    max_mb: int = 200
+
+
+class WaitlistConfig(BaseModel):
+    # Что делать с ожидающими заявками, когда освобождается место:
+    # off — ничего, suggest — прислать админам подходящие заявки,
+    # auto — одобрить подходящие заявки автоматически
+    mode: Literal["off", "suggest", "auto"] = "suggest"
+
+
+class SchedulerConfig(BaseModel):
+    # Ежедневные напоминания и сводки бота (telegram_bot/scheduler.py)
+    enabled: bool = True
+    timezone: str = "Europe/Moscow"
+    reminders_hour: int = Field(10, ge=0, le=23)
+    digest_hour: int = Field(9, ge=0, le=23)
+
+
+class IdempotencyConfig(BaseModel):
+    # Заголовок Idempotency-Key (core/idempotency.py)
+    # Сколько часов хранится ответ на запрос с ключом
+    ttl_hours: int = 24
+    # Через сколько секунд незавершенный запрос с ключом (упавший воркер)
+    # перестает блокировать повторы
+    lock_timeout: int = 60
+
+
+class ProfilingConfig(BaseModel):
+    # Выборочное профилирование запросов (core/profiling.py)
+    enabled: bool = False
+    # Доля запросов, профилируемых без заголовка X-Profile
+    sample_rate: float = 0.0
+    output_dir: str = "profiles"
+
+
+class TelegramConfig(BaseModel):
+    # В режиме webhook бот работает внутри API, отдельный процесс с polling не нужен
+    webhook_enabled: bool = False
+    webhook_url: Optional[str] = None
+    webhook_secret: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_webhook(self) -> "TelegramConfig":
+        # Без секрета ручка webhook принимала бы поддельные обновления от кого угодно
+        if self.webhook_enabled and (not self.webhook_url or not self.webhook_secret):
+            raise ValueError(
+                "Для режима webhook нужны CONFIG__TELEGRAM__WEBHOOK_URL и CONFIG__TELEGRAM__WEBHOOK_SECRET"
+            )
+        return self
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -52,6 +134,20 @@ class Settings(BaseSettings):
     run: RunConfig = RunConfig()
     api: ApiPrefix = ApiPrefix()
     db: DatabaseConfig
+    cache_bus: CacheBusConfig = CacheBusConfig()
+    telegram: TelegramConfig = TelegramConfig()
+    archive: ArchiveConfig = ArchiveConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
+    waitlist: WaitlistConfig = WaitlistConfig()
+    scheduler: SchedulerConfig = SchedulerConfig()
+    export_cache: ExportCacheConfig = ExportCacheConfig()
+    idempotency: IdempotencyConfig = IdempotencyConfig()
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Возвращает настройки приложения. Читаются при первом обращении,
+    а не при импорте модуля.
+    """
+    return Settings()
@@ -0,0 +1,92 @@
+import asyncio
+import functools
+import inspect
+from typing import Dict, Iterable
+
+
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Счетчики по каждой обернутой функции:
+    calls — всего вызовов, executions — реальных выполнений,
+    coalesced — вызовов, получивших результат чужого выполнения.
+    """
+    return {name: dict(counters) for name, counters in _stats.items()}
+
+
+def _mark_retrieved(future: asyncio.Future) -> None:
+    # Исключение уже получил ведущий вызов; без этого asyncio предупредит,
+    # если ожидающих вызовов не было
+    if not future.cancelled():
+        future.exception()
+
+
+def single_flight(exclude: Iterable[str] = ("db", "session")):
+    """
+    Объединяет одновременные вызовы с одинаковыми аргументами: выполняется
+    только первый, остальные дожидаются его результата. Сессия БД (аргументы
+    из exclude) в ключ не входит — запрос выполняется в сессии первого вызова.
+    Результат общий для всех ожидающих, поэтому изменять его нельзя.
+    """
+    exclude = frozenset(exclude)
+
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        signature = inspect.signature(fn)
+        in_flight: Dict[tuple, asyncio.Future] = {}
+        stats = _stats.setdefault(name, {"calls": 0, "executions": 0, "coalesced": 0})
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(
+                (arg, value) for arg, value in bound.arguments.items()
+                if arg not in exclude
+            )
+            stats["calls"] += 1
+
+            try:
+                hash(key)
+            except TypeError:
+                stats["executions"] += 1
+                return await fn(*args, **kwargs)
+
+            while key in in_flight:
+                future = in_flight[key]
+                try:
+                    result = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # Отменили ведущий вызов — пробуем выполнить запрос сами
+                    if future.cancelled():
+                        continue
+                    raise
+                stats["coalesced"] += 1
+                return result
+
+            future = asyncio.get_running_loop().create_future()
+            future.add_done_callback(_mark_retrieved)
+            in_flight[key] = future
+            stats["executions"] += 1
+
+            try:
+                result = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                in_flight.pop(key, None)
+                if not future.done():
+                    future.cancel()
+
+        return wrapper
+
+    return decorator
@@ -3,49 +3,49 @@ import hmac
 import hashlib
 import json
 import datetime
-from typing import List
+from typing import List, Optional, Tuple
 from urllib.parse import unquote
 from fastapi import Depends, HTTPException,  Header
-from sqlalchemy import select
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.consts import MAX_CAPACITY, PLACES_WITH_CAPACITY_CHECK
 from core.db_helper import db_helper
-from core.models.admin import Admin
 from core.models import booking as booking_model
-from dotenv import load_dotenv
-from sqlalchemy.orm import selectinload
-
-
-load_dotenv()
+from core.occupancy import OverlapIndex
+from crud.admin import get_admin_user_ids_cached
+from crud.booking import get_approved_intervals_db
+from crud.place import get_place, get_venue_place_names
 
 
 db = db_helper.session_getter
 
 
 async def verify_admin(user_id: int, db: AsyncSession) -> bool:
-    stmt = select(Admin).where(Admin.user_id == user_id)
-    result = await db.execute(stmt)
-    admin = result.scalars().first()
-
-    if not admin:
-        return False
-
-    return True
+    admin_ids = await get_admin_user_ids_cached(db)
+    return user_id in admin_ids
 
 
 async def get_bookings_for_period(
     db: AsyncSession,
     start_date: datetime,
-    end_date: datetime
+    end_date: datetime,
+    places: Optional[List[str]] = None,
+    exclude_id: Optional[int] = None
 ) -> List[booking_model.Booking]:
     """
-    Проверяет существующие бронирования на указанный период времени
+    Проверяет существующие бронирования на указанный период времени.
+    Если переданы places, учитываются только бронирования этих площадок.
     """
-    stmt = select(booking_model.Booking).filter(
+    stmt = lambda_stmt(lambda: select(booking_model.Booking).filter(
         booking_model.Booking.status == "approved",  # Проверяем только подтвержденные бронирования
         booking_model.Booking.start_date <= end_date,  # Начало существующего <= конец нового
         booking_model.Booking.end_date >= start_date,  # Конец существующего >= начало нового
-    ).options(selectinload(booking_model.Booking.comments))  # Загружаем комментарии
+    ))
+
+    if places is not None:
+        stmt += lambda s: s.filter(booking_model.Booking.place.in_(places))
+
+    if exclude_id is not None:
+        stmt += lambda s: s.filter(booking_model.Booking.id != exclude_id)
     
     result = await db.execute(stmt)
     existing_bookings = result.scalars().all()
@@ -77,27 +77,82 @@ def verify_telegram_auth(init_data: str = Header(...)):
 
 async def check_capacity(
     booking: booking_model.Booking,
-    existing_bookings: List
+    existing_bookings: List,
+    capacity: int
 ) -> bool:
     """
     Проверяет, можно ли совместить бронирование с существующими бронированиями.
-    Проверка max_capacity выполняется только для определенных площадок.
     """
-    # Проверяем, нужно ли учитывать max_capacity для данной площадки
-    should_check_capacity = booking.place in PLACES_WITH_CAPACITY_CHECK
-
     total_people = booking.people_count
     can_share = True
 
     for existing in existing_bookings:
         total_people += existing.people_count
-        if should_check_capacity and total_people > MAX_CAPACITY:
+        if total_people > capacity:
             can_share = False
             break
 
     return can_share
 
 
+async def check_place_capacity(
+    db: AsyncSession,
+    booking: booking_model.Booking,
+    exclude_id: Optional[int] = None
+) -> bool:
+    """
+    Проверяет вместимость площадки бронирования на его даты.
+    Для площадок без ограничения вместимости запрос к БД не выполняется,
+    для остальных загружаются только бронирования площадок той же локации.
+    """
+    place = await get_place(db, booking.place)
+    if place is None or place.capacity is None:
+        return True
+
+    places = await get_venue_place_names(db, place.venue)
+    existing_bookings = await get_bookings_for_period(
+        db,
+        booking.start_date,
+        booking.end_date,
+        places=places,
+        exclude_id=exclude_id
+    )
+
+    return await check_capacity(booking, existing_bookings, place.capacity)
+
+
+async def find_capacity_conflicts(
+    db: AsyncSession,
+    place_name: Optional[str],
+    bookings: List[Tuple[datetime.date, datetime.date, int]]
+) -> List[Tuple[datetime.date, datetime.date]]:
+    """
+    Проверяет вместимость сразу для нескольких бронирований одной площадки
+    (start_date, end_date, people_count): один запрос к БД на весь диапазон дат,
+    дальше — префиксные суммы по датам (core.occupancy). Бронирования проверяются
+    и с одобренными, и друг с другом. Возвращает периоды, не прошедшие проверку.
+    """
+    place = await get_place(db, place_name)
+    if place is None or place.capacity is None or not bookings:
+        return []
+
+    places = await get_venue_place_names(db, place.venue)
+    existing = await get_approved_intervals_db(
+        db,
+        places,
+        min(start for start, _, _ in bookings),
+        max(end for _, end, _ in bookings)
+    )
+
+    # В индекс входят и сами проверяемые бронирования, поэтому сумма
+    # по периоду уже включает people_count проверяемого
+    index = OverlapIndex([*existing, *bookings])
+    return [
+        (start, end) for start, end, _ in bookings
+        if index.overlapping_people(start, end) > place.capacity
+    ]
+
+
 async def get_admin_user(
     user_id: int = Depends(verify_telegram_auth),
     db: AsyncSession = Depends(db)
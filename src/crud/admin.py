@@ -1,12 +1,50 @@
-from sqlalchemy import select
+import time
+from typing import FrozenSet, Optional
+
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache_bus import CacheEvent, register_handler
 from core.models.admin import Admin
 
 
+# Список админов кэшируется в памяти процесса. Изменения в таблице admins
+# приходят через шину инвалидации, TTL страхует на случай её недоступности.
+ADMINS_CACHE_TTL = 60
+
+_admin_ids: Optional[FrozenSet[int]] = None
+_admin_ids_loaded_at: float = 0.0
+
+
 async def get_all_admin_user_ids(db: AsyncSession):
     """
     Получить все user_id из таблицы admins.
     """
-    result = await db.execute(select(Admin.user_id))
+    result = await db.execute(lambda_stmt(lambda: select(Admin.user_id)))
     return [row[0] for row in result.fetchall()]
+
+
+def invalidate_admins_cache() -> None:
+    """
+    Сбрасывает кэш админов.
+    """
+    global _admin_ids
+    _admin_ids = None
+
+
+async def get_admin_user_ids_cached(db: AsyncSession) -> FrozenSet[int]:
+    """
+    Возвращает множество user_id админов из кэша, при необходимости перечитывая его.
+    """
+    global _admin_ids, _admin_ids_loaded_at
+
+    if _admin_ids is not None and time.monotonic() - _admin_ids_loaded_at < ADMINS_CACHE_TTL:
+        return _admin_ids
+
+    _admin_ids = frozenset(await get_all_admin_user_ids(db))
+    _admin_ids_loaded_at = time.monotonic()
+
+    return _admin_ids
+
+
+register_handler(CacheEvent.admins_changed, lambda payload: invalidate_admins_cache())
@@ -0,0 +1,230 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from core.models import analytics as analytics_model
+from core.models import booking as booking_model
+from core.single_flight import single_flight
+
+
+# (площадка, тип программы, первый день, последний день)
+UtilizationScope = Tuple[str, str, date, date]
+
+_SCOPE_FIELDS = ("place", "type", "start_date", "end_date")
+
+
+# Сводки считаются и по архиву: перенос в bookings_archive не должен менять историю загрузки
+_ALL_BOOKINGS = """(
+        SELECT place, type, start_date, end_date, people_count, status FROM bookings
+        UNION ALL
+        SELECT place, type, start_date, end_date, people_count, status FROM bookings_archive
+    )"""
+
+_DELETE_DAILY = text("""
+    DELETE FROM utilization_daily
+    WHERE place = :place AND type = :type
+      AND day BETWEEN CAST(:d_from AS date) AND CAST(:d_to AS date)
+""")
+
+_INSERT_DAILY = text(f"""
+    INSERT INTO utilization_daily (place, type, day, people)
+    SELECT :place, :type, d::date, SUM(b.people_count)
+    FROM {_ALL_BOOKINGS} b
+    CROSS JOIN LATERAL generate_series(
+        GREATEST(b.start_date, CAST(:d_from AS date)),
+        LEAST(b.end_date, CAST(:d_to AS date)),
+        interval '1 day'
+    ) AS d
+    WHERE b.status = 'approved'
+      AND COALESCE(b.place, '') = :place
+      AND COALESCE(b.type, '') = :type
+      AND b.start_date <= CAST(:d_to AS date)
+      AND b.end_date >= CAST(:d_from AS date)
+    GROUP BY d
+    ON CONFLICT (place, type, day) DO UPDATE SET people = excluded.people
+""")
+
+_DELETE_MONTHLY = text("""
+    DELETE FROM utilization_monthly
+    WHERE place = :place AND type = :type
+      AND month BETWEEN CAST(:d_from AS date) AND CAST(:d_to AS date)
+""")
+
+_INSERT_MONTHLY = text(f"""
+    INSERT INTO utilization_monthly (
+        place, type, month, person_days, peak_people, peak_day,
+        approved_count, rejected_count, pending_count
+    )
+    SELECT :place, :type, m.month::date,
+           COALESCE(dd.person_days, 0), COALESCE(dd.peak_people, 0), dd.peak_day,
+           COALESCE(c.approved, 0), COALESCE(c.rejected, 0), COALESCE(c.pending, 0)
+    FROM generate_series(CAST(:d_from AS date), CAST(:d_to AS date), interval '1 month') AS m(month)
+    LEFT JOIN LATERAL (
+        SELECT SUM(u.people) AS person_days,
+               MAX(u.people) AS peak_people,
+               (array_agg(u.day ORDER BY u.people DESC, u.day))[1] AS peak_day
+        FROM utilization_daily u
+        WHERE u.place = :place AND u.type = :type
+          AND u.day >= m.month AND u.day < m.month + interval '1 month'
+    ) dd ON true
+    LEFT JOIN LATERAL (
+        SELECT COUNT(*) FILTER (WHERE b.status = 'approved') AS approved,
+               COUNT(*) FILTER (WHERE b.status = 'rejected') AS rejected,
+               COUNT(*) FILTER (WHERE b.status = 'pending') AS pending
+        FROM {_ALL_BOOKINGS} b
+        WHERE COALESCE(b.place, '') = :place
+          AND COALESCE(b.type, '') = :type
+          AND b.start_date >= m.month AND b.start_date < m.month + interval '1 month'
+    ) c ON true
+    WHERE dd.person_days IS NOT NULL
+       OR COALESCE(c.approved, 0) + COALESCE(c.rejected, 0) + COALESCE(c.pending, 0) > 0
+    ON CONFLICT (place, type, month) DO UPDATE SET
+        person_days = excluded.person_days,
+        peak_people = excluded.peak_people,
+        peak_day = excluded.peak_day,
+        approved_count = excluded.approved_count,
+        rejected_count = excluded.rejected_count,
+        pending_count = excluded.pending_count
+""")
+
+
+_SCOPES_ALL = text(f"""
+    SELECT COALESCE(b.place, ''), COALESCE(b.type, ''), MIN(b.start_date), MAX(b.end_date)
+    FROM {_ALL_BOOKINGS} b
+    GROUP BY 1, 2
+""")
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _next_month(d: date) -> date:
+    if d.month == 12:
+        return date(d.year + 1, 1, 1)
+    return date(d.year, d.month + 1, 1)
+
+
+def utilization_scopes(booking: booking_model.Booking) -> Set[UtilizationScope]:
+    """
+    Возвращает области сводок, которые затрагивает бронирование.
+    Учитываются и текущие, и прежние (ещё не сохранённые) значения полей,
+    поэтому вызывать нужно до commit.
+    """
+    state = inspect(booking)
+    values = {}
+    for field in _SCOPE_FIELDS:
+        history = state.attrs[field].history
+        values[field] = [getattr(booking, field), *history.deleted]
+
+    start = min(_as_date(v) for v in values["start_date"] if v is not None)
+    end = max(_as_date(v) for v in values["end_date"] if v is not None)
+    return {
+        (place or "", type_ or "", start, end)
+        for place in set(values["place"])
+        for type_ in set(values["type"])
+    }
+
+
+async def refresh_utilization(
+    db: AsyncSession,
+    scopes: Iterable[UtilizationScope]
+) -> None:
+    """
+    Инкрементально пересчитывает сводки только для затронутых
+    площадок, типов программ и месяцев.
+
+    Выполняется в транзакции изменения бронирований, до commit: сводки
+    сохраняются или откатываются вместе с бронированиями. Вызывающий уже
+    держит блокировку ленты изменений (stamp_change/next_change_seq),
+    поэтому пересчеты одной площадки не пересекаются, а каждый видит
+    все ранее закоммиченные изменения.
+    """
+    merged = {}
+    for place, type_, start, end in scopes:
+        key = (place, type_)
+        if key in merged:
+            prev_start, prev_end = merged[key]
+            merged[key] = (min(prev_start, start), max(prev_end, end))
+        else:
+            merged[key] = (start, end)
+
+    if not merged:
+        return
+
+    # autoflush выключен, а запросы сводок должны видеть изменения сессии
+    await db.flush()
+    for (place, type_), (start, end) in merged.items():
+        params = {
+            "place": place,
+            "type": type_,
+            "d_from": start.replace(day=1),
+            "d_to": _next_month(end) - timedelta(days=1),
+        }
+        for stmt in (_DELETE_DAILY, _INSERT_DAILY, _DELETE_MONTHLY, _INSERT_MONTHLY):
+            await db.execute(stmt, params)
+
+
+async def rebuild_utilization(db: AsyncSession) -> None:
+    """
+    Полностью перестраивает сводки по всем бронированиям одной транзакцией.
+    Нужна для первоначального заполнения таблиц и исправления расхождений.
+    """
+    # crud.booking импортирует этот модуль, поэтому импорт здесь
+    from crud.booking import CHANGE_FEED_LOCK_KEY
+
+    # Под блокировкой ленты изменений бронирования не меняются до конца пересчета
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_FEED_LOCK_KEY})
+    result = await db.execute(_SCOPES_ALL)
+    scopes = [tuple(row) for row in result.all()]
+
+    await db.execute(text("TRUNCATE utilization_daily, utilization_monthly"))
+    await refresh_utilization(db, scopes)
+    await db.commit()
+    logger.info(f"Сводки загрузки перестроены: областей {len(scopes)}")
+
+
+@single_flight()
+async def get_utilization_db(
+    db: AsyncSession,
+    month_from: date,
+    month_to: date,
+    place: Optional[str] = None,
+    type: Optional[str] = None
+) -> List[dict]:
+    """
+    Возвращает помесячную загрузку площадок из готовых сводок.
+    """
+    monthly = analytics_model.UtilizationMonthly
+    stmt = select(monthly).where(
+        monthly.month >= month_from.replace(day=1),
+        monthly.month <= month_to
+    )
+    if place is not None:
+        stmt = stmt.where(monthly.place == place)
+    if type is not None:
+        stmt = stmt.where(monthly.type == type)
+    stmt = stmt.order_by(monthly.month, monthly.place, monthly.type)
+
+    result = await db.execute(stmt)
+    rows = []
+    for row in result.scalars().all():
+        decided = row.approved_count + row.rejected_count
+        rows.append({
+            "month": row.month,
+            "place": row.place or None,
+            "type": row.type or None,
+            "person_days": row.person_days,
+            "peak_people": row.peak_people,
+            "peak_day": row.peak_day,
+            "approved_count": row.approved_count,
+            "rejected_count": row.rejected_count,
+            "pending_count": row.pending_count,
+            "approval_rate": row.approved_count / decided if decided else None,
+        })
+    return rows
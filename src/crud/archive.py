@@ -0,0 +1,89 @@
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache_bus import CacheEvent, publish
+from core.models import booking as booking_model
+from core.models import comment as comment_model
+from crud.booking import CHANGE_FEED_LOCK_KEY
+
+
+# Ключ advisory-блокировки: архивирует только один воркер одновременно
+ARCHIVE_LOCK_KEY = 370002
+
+# Колонки перечисляются явно: порядок колонок в архиве и в рабочей таблице
+# может отличаться, если колонки добавлялись вручную через ALTER
+_BOOKING_COLUMNS = ", ".join(column.name for column in booking_model.Booking.__table__.columns)
+_COMMENT_COLUMNS = ", ".join(column.name for column in comment_model.Comment.__table__.columns)
+
+_LOCK = text("SELECT pg_try_advisory_xact_lock(:key)")
+
+# Та же блокировка, что и в next_change_seq: номера удалений в ленте
+# изменений выдаются в порядке commit. Берется до блокировки строк,
+# как и в обычных изменениях бронирований, чтобы не было взаимоблокировок.
+_CHANGE_FEED_LOCK = text("SELECT pg_advisory_xact_lock(:key)")
+
+_SELECT_BATCH = text("""
+    SELECT id FROM bookings
+    WHERE end_date < :cutoff
+    ORDER BY id
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+""")
+
+_MOVE_COMMENTS = text(f"""
+    WITH moved AS (
+        DELETE FROM comments WHERE booking_id = ANY(:ids)
+        RETURNING {_COMMENT_COLUMNS}
+    )
+    INSERT INTO comments_archive ({_COMMENT_COLUMNS})
+    SELECT {_COMMENT_COLUMNS} FROM moved
+""")
+
+# Для клиентов ленты изменений, кэшей и версии расписания перенос
+# в архив — это удаление: каждое бронирование получает запись в booking_tombstones
+_MOVE_BOOKINGS = text(f"""
+    WITH moved AS (
+        DELETE FROM bookings WHERE id = ANY(:ids)
+        RETURNING {_BOOKING_COLUMNS}
+    ), archived AS (
+        INSERT INTO bookings_archive ({_BOOKING_COLUMNS})
+        SELECT {_BOOKING_COLUMNS} FROM moved
+    )
+    INSERT INTO booking_tombstones (booking_id, user_id, change_seq)
+    SELECT id, user_id, nextval('bookings_change_seq') FROM moved ORDER BY id
+    ON CONFLICT (booking_id) DO UPDATE SET
+        user_id = excluded.user_id,
+        change_seq = excluded.change_seq,
+        deleted_at = now()
+""")
+
+
+async def archive_bookings_batch(db: AsyncSession, cutoff: date, batch_size: int) -> int:
+    """
+    Переносит в архив до batch_size бронирований, закончившихся до cutoff,
+    вместе с их комментариями, и записывает для них удаления в ленту изменений. Возвращает число перенесенных бронирований;
+    0 — если переносить нечего или архивирует другой воркер.
+    """
+    try:
+        locked = (await db.execute(_LOCK, {"key": ARCHIVE_LOCK_KEY})).scalar_one()
+        if not locked:
+            await db.rollback()
+            return 0
+
+        await db.execute(_CHANGE_FEED_LOCK, {"key": CHANGE_FEED_LOCK_KEY})
+
+        result = await db.execute(_SELECT_BATCH, {"cutoff": cutoff, "batch_size": batch_size})
+        ids = result.scalars().all()
+
+        if ids:
+            await db.execute(_MOVE_COMMENTS, {"ids": ids})
+            await db.execute(_MOVE_BOOKINGS, {"ids": ids})
+            await publish(db, CacheEvent.booking_changed, archived=len(ids))
+
+        await db.commit()
+        return len(ids)
+    except Exception:
+        await db.rollback()
+        raise
@@ -1,44 +1,95 @@
 from collections import defaultdict
-from datetime import timedelta, datetime
-from typing import List, Optional
-from sqlalchemy import select
+from datetime import date, timedelta, datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, func, lambda_stmt, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from core.models import booking as booking_model
 from core.schemas import booking as booking_schema
 from core.models import comment as comment_model
+from core.cache_bus import CacheEvent, publish
+from core.serializers import BOOKING_COLUMNS
+from core.single_flight import single_flight
+from crud.analytics import refresh_utilization, utilization_scopes
 from telegram_bot.utils.utils import new_booking_notification
 from loguru import logger
 
 
+# Ключ транзакционной advisory-блокировки, под которой выдаются номера изменений
+CHANGE_FEED_LOCK_KEY = 370001
+
+
+async def lock_change_feed(db: AsyncSession) -> None:
+    """
+    Берет блокировку ленты изменений до конца транзакции. Ее берет любое
+    изменение бронирований, поэтому под ней прочитанные бронирования
+    не изменятся до commit.
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_FEED_LOCK_KEY})
+
+
+async def next_change_seq(db: AsyncSession) -> int:
+    """
+    Выдает номер изменения для ленты /bookings/changes.
+    Блокировка держится до конца транзакции, поэтому следующая транзакция
+    получит номер только после commit текущей: номера становятся видны
+    в порядке возрастания, и клиент с курсором ничего не пропустит.
+    """
+    await lock_change_feed(db)
+    result = await db.execute(text("SELECT nextval('bookings_change_seq')"))
+    return result.scalar_one()
+
+
+async def next_change_seqs(db: AsyncSession, n: int) -> List[int]:
+    """
+    Выдает n номеров изменений одним запросом под той же блокировкой,
+    что и next_change_seq, — для массовых изменений (серии).
+    """
+    await lock_change_feed(db)
+    result = await db.execute(
+        text("SELECT nextval('bookings_change_seq') FROM generate_series(1, :n)"),
+        {"n": n}
+    )
+    return sorted(result.scalars().all())
+
+
+async def stamp_change(db: AsyncSession, booking: booking_model.Booking) -> None:
+    booking.change_seq = await next_change_seq(db)
+    booking.updated_at = func.now()
+
+
 async def get_bookings_db(
     db: AsyncSession,
     is_admin: bool = False,
     user_id: Optional[int] = None,
     sort_by: str = "id",
     sort_order: str = "asc"
-) -> List[booking_schema.Booking]:
-    stmt = select(booking_model.Booking).options(selectinload(booking_model.Booking.comments))
-    
-    if not is_admin and user_id:
-        stmt = stmt.where(booking_model.Booking.user_id == user_id)
-    elif not is_admin and not user_id:
+) -> list:
+    """
+    Возвращает бронирования строками из колонок BOOKING_COLUMNS, без ORM-объектов
+    и без валидации: ответ собирается напрямую в core.serializers.
+    """
+    if not is_admin and not user_id:
         return []
 
+    # lambda_stmt: запрос строится и получает ключ кэша один раз на каждую
+    # комбинацию веток, дальше подставляются только параметры
+    stmt = lambda_stmt(lambda: select(*BOOKING_COLUMNS))
+
+    if not is_admin:
+        stmt += lambda s: s.where(booking_model.Booking.user_id == user_id)
+
     # Определяем поле для сортировки
     sort_field = getattr(booking_model.Booking, sort_by)
     
     # Применяем сортировку
     if sort_order == "desc":
-        stmt = stmt.order_by(sort_field.desc())
+        stmt += lambda s: s.order_by(sort_field.desc())
     else:
-        stmt = stmt.order_by(sort_field.asc())
+        stmt += lambda s: s.order_by(sort_field.asc())
 
     result = await db.execute(stmt)
-    bookings = result.scalars().all()
-    
-    return [booking_schema.Booking.model_validate(b) for b in bookings]
+    return result.all()
 
 
 async def create_booking_db(
@@ -73,15 +124,13 @@ async def create_booking_db(
     )
     
     db.add(db_booking)
+    await stamp_change(db, db_booking)
+    scopes = utilization_scopes(db_booking)
+    await publish(db, CacheEvent.booking_changed, place=db_booking.place)
+    await refresh_utilization(db, scopes)
     await db.commit()
     await db.refresh(db_booking)
 
-    stmt = select(booking_model.Booking).where(
-        booking_model.Booking.id == db_booking.id
-    ).options(selectinload(booking_model.Booking.comments))
-    result = await db.execute(stmt)
-    db_booking = result.scalars().first()
-
     return db_booking
 
 
@@ -95,6 +144,10 @@ async def change_booking_status(
     Меняет статус бронирования в базе данных.
     """
     booking.status = status
+    await stamp_change(db, booking)
+    scopes = utilization_scopes(booking)
+    await publish(db, CacheEvent.booking_changed, id=booking.id, place=booking.place)
+    await refresh_utilization(db, scopes)
     await db.commit()
     await db.refresh(booking)
 
@@ -145,9 +198,9 @@ async def get_booking_by_id_db(
     """
     Возвращает бронь по ID из базы данных.
     """
-    stmt = select(booking_model.Booking).where(
+    stmt = lambda_stmt(lambda: select(booking_model.Booking).where(
         booking_model.Booking.id == booking_id
-    ).options(selectinload(booking_model.Booking.comments))
+    ))
     
     result = await db.execute(stmt)
     booking = result.scalars().first()
@@ -205,6 +258,10 @@ async def update_booking_db(
     if booking_update.other_info:
         booking.other_info = booking_update.other_info
     
+    await stamp_change(db, booking)
+    scopes = utilization_scopes(booking)
+    await publish(db, CacheEvent.booking_changed, id=booking.id, place=booking.place)
+    await refresh_utilization(db, scopes)
     await db.commit()
     await db.refresh(booking)
 
@@ -218,10 +275,24 @@ async def delete_booking_db(
     """
     Удаляет бронь из базы данных.
     """
+    scopes = utilization_scopes(booking)
+    # Комментарии удаляем одним запросом, не загружая их в сессию
+    await db.execute(
+        delete(comment_model.Comment).where(comment_model.Comment.booking_id == booking.id)
+    )
     await db.delete(booking)
+    db.add(booking_model.BookingTombstone(
+        booking_id=booking.id,
+        user_id=booking.user_id,
+        change_seq=await next_change_seq(db),
+        deleted_at=func.now()
+    ))
+    await publish(db, CacheEvent.booking_changed, id=booking.id, place=booking.place)
+    await refresh_utilization(db, scopes)
     await db.commit()
 
 
+@single_flight()
 async def get_calendar_data_db(db: AsyncSession) -> dict:
     """
     Получает данные для календаря бронирований.
@@ -256,6 +327,85 @@ async def get_calendar_data_db(db: AsyncSession) -> dict:
     return calendar_data
 
 
+# Поля бронирования в порядке колонок выгрузки
+EXPORT_COLUMNS = [
+    "id", "user_id", "start_date", "end_date", "people_count",
+    "people_count_overall", "name", "theme", "description", "status",
+    "target_audience", "registration", "logistics", "type", "place",
+    "participants_accomodation", "experts_count", "curator_fio", "curator_position",
+    "curator_contact", "other_info"
+]
+
+
+def get_export_query(start_date: date, end_date: date):
+    """
+    Запрос бронирований за период (только нужные колонки, без ORM-объектов).
+    """
+    return select(
+        *(getattr(booking_model.Booking, column) for column in EXPORT_COLUMNS)
+    ).where(
+        booking_model.Booking.start_date >= start_date,
+        booking_model.Booking.end_date <= end_date
+    ).order_by(booking_model.Booking.start_date, booking_model.Booking.end_date)
+
+
+@single_flight()
+async def get_export_bookings_db(db: AsyncSession, start_date: date, end_date: date) -> list:
+    """
+    Возвращает бронирования за период для выгрузки в Excel.
+    """
+    result = await db.execute(get_export_query(start_date, end_date))
+    return result.all()
+
+
+async def get_schedule_version_db(db: AsyncSession) -> int:
+    """
+    Версия расписания — номер последнего изменения бронирований (включая удаления).
+    Меняется при любом создании, изменении и удалении бронирования.
+    """
+    stmt = select(func.greatest(
+        select(func.coalesce(func.max(booking_model.Booking.change_seq), 0)).scalar_subquery(),
+        select(func.coalesce(func.max(booking_model.BookingTombstone.change_seq), 0)).scalar_subquery()
+    ))
+    result = await db.execute(stmt)
+    return result.scalar_one()
+
+
+async def get_feed_bookings_db(
+    db: AsyncSession,
+    place: Optional[str] = None,
+    user_id: Optional[int] = None,
+    days_back: int = 365
+) -> list:
+    """
+    Возвращает одобренные бронирования для календарной ленты (только нужные колонки).
+    """
+    booking = booking_model.Booking
+    stmt = select(
+        booking.id,
+        booking.start_date,
+        booking.end_date,
+        booking.name,
+        booking.theme,
+        booking.place,
+        booking.description,
+    ).where(
+        booking.status == "approved",
+        booking.end_date >= datetime.now().date() - timedelta(days=days_back)
+    )
+
+    if place is not None:
+        stmt = stmt.where(booking.place == place)
+
+    if user_id is not None:
+        stmt = stmt.where(booking.user_id == user_id)
+
+    stmt = stmt.order_by(booking.start_date, booking.id)
+
+    result = await db.execute(stmt)
+    return result.all()
+
+
 async def create_comment_db(
     db: AsyncSession,
     booking_id: int,
@@ -270,7 +420,119 @@ async def create_comment_db(
     )
 
     db.add(db_comment)
+    await db.execute(
+        update(booking_model.Booking)
+        .where(booking_model.Booking.id == booking_id)
+        .values(
+            comment_count=booking_model.Booking.comment_count + 1,
+            change_seq=await next_change_seq(db),
+            updated_at=func.now()
+        )
+    )
     await db.commit()
     await db.refresh(db_comment)
 
     return db_comment
+
+
+async def get_comments_db(
+    db: AsyncSession,
+    booking_id: int,
+    limit: Optional[int] = 50,
+    after_id: Optional[int] = None
+) -> List[comment_model.Comment]:
+    """
+    Возвращает страницу комментариев к бронированию в порядке добавления.
+    Пагинация по id: следующая страница начинается после after_id.
+    С limit=None возвращает все комментарии.
+    """
+    stmt = select(comment_model.Comment).where(
+        comment_model.Comment.booking_id == booking_id
+    )
+
+    if after_id is not None:
+        stmt = stmt.where(comment_model.Comment.id > after_id)
+
+    stmt = stmt.order_by(comment_model.Comment.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+async def get_booking_changes_db(
+    db: AsyncSession,
+    since: int,
+    limit: int,
+    user_id: Optional[int] = None
+) -> Tuple[list, list]:
+    """
+    Возвращает изменения после курсора since: строки бронирований
+    (BOOKING_COLUMNS и change_seq) и удаления (booking_id, change_seq).
+    Каждый список упорядочен по change_seq и ограничен limit записями.
+    Если передан user_id, возвращаются только изменения его бронирований.
+    """
+    booking = booking_model.Booking
+    tombstone = booking_model.BookingTombstone
+
+    stmt = select(*BOOKING_COLUMNS, booking.change_seq).where(booking.change_seq > since)
+    deleted_stmt = select(tombstone.booking_id, tombstone.change_seq).where(tombstone.change_seq > since)
+
+    if user_id is not None:
+        stmt = stmt.where(booking.user_id == user_id)
+        deleted_stmt = deleted_stmt.where(tombstone.user_id == user_id)
+
+    result = await db.execute(stmt.order_by(booking.change_seq).limit(limit))
+    changed = result.all()
+
+    # При первой синхронизации удаления не нужны: у клиента еще нет копии
+    deleted = []
+    if since > 0:
+        result = await db.execute(deleted_stmt.order_by(tombstone.change_seq).limit(limit))
+        deleted = result.all()
+
+    return changed, deleted
+
+
+async def get_approved_intervals_db(
+    db: AsyncSession,
+    places: List[str],
+    start_date: date,
+    end_date: date
+) -> list:
+    """
+    Возвращает (start_date, end_date, people_count) одобренных бронирований
+    указанных площадок, пересекающихся с периодом.
+    """
+    booking = booking_model.Booking
+    stmt = select(booking.start_date, booking.end_date, booking.people_count).where(
+        booking.status == "approved",
+        booking.place.in_(places),
+        booking.start_date <= end_date,
+        booking.end_date >= start_date
+    )
+
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_approved_place_intervals_db(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date
+) -> list:
+    """
+    Возвращает (place, start_date, end_date, people_count) одобренных
+    бронирований всех площадок, пересекающихся с периодом.
+    """
+    booking = booking_model.Booking
+    stmt = select(booking.place, booking.start_date, booking.end_date, booking.people_count).where(
+        booking.status == "approved",
+        booking.place.is_not(None),
+        booking.start_date <= end_date,
+        booking.end_date >= start_date
+    )
+
+    result = await db.execute(stmt)
+    return result.all()
@@ -0,0 +1,105 @@
+import secrets
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache_bus import CacheEvent, publish, register_handler
+from core.models.calendar_feed import CalendarFeedToken
+
+
+# Соответствие "токен -> пользователь" кэшируется в памяти процесса, чтобы
+# опрос личной ленты не ходил в БД. Замена токена приходит через шину
+# инвалидации, TTL страхует на случай её недоступности.
+FEED_TOKENS_CACHE_TTL = 60
+FEED_TOKENS_CACHE_SIZE = 5000
+
+_token_users: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+
+def _new_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+async def get_feed_token_db(db: AsyncSession, user_id: int, rotate: bool = False) -> str:
+    """
+    Возвращает токен личной ленты пользователя, создавая его при первом запросе.
+    С rotate=True выдает новый токен: ссылка со старым перестает работать.
+    """
+    stmt = insert(CalendarFeedToken).values(
+        user_id=user_id,
+        token=_new_token(),
+        created_at=func.now()
+    )
+    if rotate:
+        # Старая ссылка должна перестать работать во всех воркерах
+        await publish(db, CacheEvent.feed_token_changed, user_id=user_id)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CalendarFeedToken.user_id],
+            set_={"token": stmt.excluded.token, "created_at": stmt.excluded.created_at}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[CalendarFeedToken.user_id])
+
+    await db.execute(stmt)
+    result = await db.execute(
+        select(CalendarFeedToken.token).where(CalendarFeedToken.user_id == user_id)
+    )
+    token = result.scalar_one()
+    await db.commit()
+    if rotate:
+        # Текущий воркер не ждет события шины
+        invalidate_feed_tokens_cache(user_id)
+    return token
+
+
+async def get_feed_token_user_db(db: AsyncSession, token: str) -> Optional[int]:
+    """
+    Возвращает пользователя по токену ленты или None, если токен неизвестен.
+    """
+    result = await db.execute(
+        select(CalendarFeedToken.user_id).where(CalendarFeedToken.token == token)
+    )
+    return result.scalar_one_or_none()
+
+
+def invalidate_feed_tokens_cache(user_id: Optional[int] = None) -> None:
+    """
+    Сбрасывает токены пользователя, а без user_id — весь кэш токенов.
+    """
+    if user_id is None:
+        _token_users.clear()
+        return
+    for token in [t for t, (uid, _) in _token_users.items() if uid == user_id]:
+        del _token_users[token]
+
+
+async def get_feed_token_user_cached(db: AsyncSession, token: str) -> Optional[int]:
+    """
+    Возвращает пользователя по токену ленты из кэша, при необходимости читая БД.
+    Неизвестные токены не кэшируются.
+    """
+    entry = _token_users.get(token)
+    if entry is not None and time.monotonic() - entry[1] < FEED_TOKENS_CACHE_TTL:
+        _token_users.move_to_end(token)
+        return entry[0]
+
+    user_id = await get_feed_token_user_db(db, token)
+    if user_id is None:
+        _token_users.pop(token, None)
+        return None
+
+    _token_users[token] = (user_id, time.monotonic())
+    _token_users.move_to_end(token)
+    while len(_token_users) > FEED_TOKENS_CACHE_SIZE:
+        _token_users.popitem(last=False)
+    return user_id
+
+
+register_handler(
+    CacheEvent.feed_token_changed,
+    lambda payload: invalidate_feed_tokens_cache(payload.get("user_id"))
+)
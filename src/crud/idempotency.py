@@ -0,0 +1,105 @@
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.idempotency import IdempotencyKey
+
+
+async def claim_idempotency_key_db(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    fingerprint: str,
+    ttl: timedelta,
+    lock_timeout: timedelta
+) -> bool:
+    """
+    Занимает ключ под выполнение запроса. Возвращает False, если ключ уже
+    занят: запрос с ним выполнен или выполняется прямо сейчас. Просроченный
+    ключ (старше ttl) и ключ, запрос с которым не завершился за lock_timeout
+    (воркер упал), занимаются заново.
+    """
+    stmt = insert(IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        fingerprint=fingerprint,
+        created_at=func.now()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "fingerprint": stmt.excluded.fingerprint,
+            "status_code": None,
+            "response": None,
+            "created_at": func.now(),
+        },
+        where=or_(
+            IdempotencyKey.created_at < func.now() - ttl,
+            and_(
+                IdempotencyKey.status_code.is_(None),
+                IdempotencyKey.created_at < func.now() - lock_timeout
+            )
+        )
+    ).returning(IdempotencyKey.key)
+
+    result = await db.execute(stmt)
+    claimed = result.first() is not None
+    await db.commit()
+    return claimed
+
+
+async def get_idempotency_key_db(
+    db: AsyncSession,
+    user_id: int,
+    key: str
+) -> Optional[IdempotencyKey]:
+    stmt = select(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key
+    )
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+
+async def save_idempotent_response_db(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    status_code: int,
+    response: bytes
+) -> None:
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(status_code=status_code, response=response)
+    )
+    await db.commit()
+
+
+async def release_idempotency_key_db(db: AsyncSession, user_id: int, key: str) -> None:
+    """
+    Освобождает ключ, запрос с которым завершился ошибкой сервера,
+    чтобы повтор выполнил запрос заново.
+    """
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None)
+        )
+    )
+    await db.commit()
+
+
+async def purge_idempotency_keys_db(db: AsyncSession, ttl: timedelta) -> int:
+    """
+    Удаляет ключи старше ttl. Возвращает число удаленных ключей.
+    """
+    result = await db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.created_at < func.now() - ttl)
+    )
+    await db.commit()
+    return result.rowcount
@@ -0,0 +1,25 @@
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.occupancy import OccupancyMatrix, occupancy_cache
+from core.single_flight import single_flight
+from crud.booking import get_approved_place_intervals_db
+
+
+@single_flight()
+async def get_occupancy_matrix(db: AsyncSession, year: int) -> OccupancyMatrix:
+    """
+    Возвращает матрицу занятости за год из кэша процесса,
+    при необходимости строя ее одним запросом к БД.
+    """
+    matrix = occupancy_cache.get(year)
+    if matrix is not None:
+        return matrix
+
+    version = occupancy_cache.version
+    bookings = await get_approved_place_intervals_db(db, date(year, 1, 1), date(year, 12, 31))
+    matrix = OccupancyMatrix(year, bookings)
+    occupancy_cache.put(version, matrix)
+
+    return matrix
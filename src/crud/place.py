@@ -0,0 +1,90 @@
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache_bus import CacheEvent, register_handler
+from core.models import place as place_model
+from core.schemas import place as place_schema
+
+
+# Площадки меняются редко, поэтому держим их в памяти процесса.
+# Изменения в таблице places приходят через шину инвалидации,
+# TTL страхует на случай её недоступности.
+PLACES_CACHE_TTL = 60
+
+_places_cache: Optional[Dict[str, place_schema.Place]] = None
+_places_loaded_at: float = 0.0
+
+
+def invalidate_places_cache() -> None:
+    """
+    Сбрасывает кэш площадок.
+    """
+    global _places_cache
+    _places_cache = None
+
+
+async def get_places(db: AsyncSession) -> Dict[str, place_schema.Place]:
+    """
+    Возвращает все площадки (название -> площадка) из кэша,
+    при необходимости перечитывая их из БД.
+    """
+    global _places_cache, _places_loaded_at
+
+    if _places_cache is not None and time.monotonic() - _places_loaded_at < PLACES_CACHE_TTL:
+        return _places_cache
+
+    result = await db.execute(select(place_model.Place).order_by(place_model.Place.name))
+    _places_cache = {
+        place.name: place_schema.Place.model_validate(place)
+        for place in result.scalars().all()
+    }
+    _places_loaded_at = time.monotonic()
+
+    return _places_cache
+
+
+async def get_place(db: AsyncSession, name: Optional[str]) -> Optional[place_schema.Place]:
+    """
+    Возвращает площадку по названию или None, если такой площадки нет.
+    """
+    if name is None:
+        return None
+
+    places = await get_places(db)
+    return places.get(name)
+
+
+async def get_venue_place_names(db: AsyncSession, venue: str) -> List[str]:
+    """
+    Возвращает названия всех площадок, делящих общую вместимость.
+    """
+    places = await get_places(db)
+    return [place.name for place in places.values() if place.venue == venue]
+
+
+async def upsert_place_db(db: AsyncSession, place: place_schema.PlaceBase) -> place_model.Place:
+    """
+    Создает площадку или обновляет существующую с тем же названием.
+    """
+    stmt = select(place_model.Place).where(place_model.Place.name == place.name)
+    result = await db.execute(stmt)
+    db_place = result.scalars().first()
+
+    if db_place is None:
+        db_place = place_model.Place(name=place.name)
+        db.add(db_place)
+
+    db_place.venue = place.venue
+    db_place.capacity = place.capacity
+
+    await db.commit()
+    await db.refresh(db_place)
+    invalidate_places_cache()
+
+    return db_place
+
+
+register_handler(CacheEvent.places_changed, lambda payload: invalidate_places_cache())
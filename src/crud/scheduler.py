@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models import booking as booking_model
+from core.models.scheduler import JobRun
+
+
+async def claim_job_run_db(db: AsyncSession, job: str, run_date: date, timeout: timedelta) -> bool:
+    """
+    Отмечает запуск задачи за день. Возвращает False, если задачу за этот
+    день уже выполнил или выполняет другой воркер — тогда запускать ее не нужно.
+    Незавершенная отметка старше timeout (воркер упал во время задачи)
+    перезахватывается.
+    """
+    stmt = insert(JobRun).values(
+        job=job,
+        run_date=run_date,
+        started_at=func.now()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobRun.job, JobRun.run_date],
+        set_={"started_at": func.now()},
+        where=(JobRun.finished_at.is_(None)) & (JobRun.started_at < func.now() - timeout)
+    ).returning(JobRun.job)
+
+    result = await db.execute(stmt)
+    claimed = result.first() is not None
+    await db.commit()
+    return claimed
+
+
+async def is_job_run_finished_db(db: AsyncSession, job: str, run_date: date) -> bool:
+    """
+    Выполнена ли задача за день (отметка есть и в ней заполнен finished_at).
+    """
+    result = await db.execute(
+        select(JobRun.finished_at).where(JobRun.job == job, JobRun.run_date == run_date)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def finish_job_run_db(db: AsyncSession, job: str, run_date: date) -> None:
+    """
+    Отмечает, что задача за день выполнена.
+    """
+    await db.execute(
+        update(JobRun)
+        .where(JobRun.job == job, JobRun.run_date == run_date)
+        .values(finished_at=func.now())
+    )
+    await db.commit()
+
+
+async def release_job_run_db(db: AsyncSession, job: str, run_date: date) -> None:
+    """
+    Снимает отметку незавершенной задачи, чтобы ее можно было запустить повторно.
+    """
+    await db.execute(
+        delete(JobRun).where(
+            JobRun.job == job,
+            JobRun.run_date == run_date,
+            JobRun.finished_at.is_(None)
+        )
+    )
+    await db.commit()
+
+
+async def get_bookings_starting_db(db: AsyncSession, day: date) -> list:
+    """
+    Одобренные бронирования, начинающиеся в указанный день (только нужные колонки).
+    """
+    booking = booking_model.Booking
+    stmt = select(
+        booking.id, booking.user_id, booking.name, booking.theme, booking.place,
+        booking.start_date, booking.end_date, booking.people_count
+    ).where(
+        booking.status == "approved",
+        booking.start_date == day
+    ).order_by(booking.place, booking.id)
+
+    result = await db.execute(stmt)
+    return result.all()
+
+
+async def get_pending_bookings_db(db: AsyncSession) -> list:
+    """
+    Все ожидающие рассмотрения заявки в порядке подачи (только нужные колонки).
+    """
+    booking = booking_model.Booking
+    stmt = select(
+        booking.id, booking.name, booking.theme, booking.place,
+        booking.start_date, booking.end_date, booking.people_count
+    ).where(
+        booking.status == "pending"
+    ).order_by(booking.id)
+
+    result = await db.execute(stmt)
+    return result.all()
@@ -0,0 +1,143 @@
+from datetime import date
+from typing import List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from core.cache_bus import CacheEvent, publish
+from core.models import booking as booking_model
+from core.schemas import booking as booking_schema
+from crud.analytics import refresh_utilization, utilization_scopes
+from crud.booking import next_change_seqs
+from telegram_bot.utils.utils import new_booking_notification
+
+
+def series_details(series_id: int, bookings: List[booking_model.Booking]) -> str:
+    """
+    Текст уведомления о серии: общие поля и список дат всех занятий.
+    """
+    first = bookings[0]
+    dates = "\n".join(
+        f"  {b.start_date.strftime('%d.%m.%Y')} — {b.end_date.strftime('%d.%m.%Y')} (№{b.id})"
+        for b in bookings
+    )
+    return (
+        f"\n<b>Серия:</b> {series_id}, занятий: {len(bookings)}\n"
+        f"<b>Даты:</b>\n{dates}\n"
+        f"<b>Название:</b> {first.name}\n"
+        f"<b>Тема:</b> {first.theme}\n"
+        f"<b>Количество участников с проживанием:</b> {first.people_count}\n"
+        f"<b>Количество участников и зрителей всего:</b> {first.people_count_overall}\n"
+        f"<b>Тип программы:</b> {first.type or '-'}\n"
+        f"<b>Место:</b> {first.place or '-'}\n"
+        f"<b>Куратор:</b> {first.curator_fio or '-'}\n"
+        f"<b>Контакты куратора:</b> {first.curator_contact or '-'}"
+    )
+
+
+async def create_series_db(
+    db: AsyncSession,
+    booking: booking_schema.BookingSeriesCreate,
+    occurrences: List[Tuple[date, date]],
+    user_id: int
+) -> Tuple[booking_model.BookingSeries, List[booking_model.Booking]]:
+    """
+    Создает серию и все ее занятия одной транзакцией; администраторам
+    уходит одно уведомление на всю серию.
+    """
+    change_seqs = await next_change_seqs(db, len(occurrences))
+
+    series = booking_model.BookingSeries(
+        user_id=user_id,
+        freq=booking.recurrence.freq.value,
+        interval=booking.recurrence.interval,
+        occurrences=len(occurrences),
+        created_at=func.now()
+    )
+    db.add(series)
+    await db.flush()
+
+    fields = booking.model_dump(exclude={"recurrence", "start_date", "end_date"})
+    bookings = [
+        booking_model.Booking(
+            **fields,
+            user_id=user_id,
+            start_date=start,
+            end_date=end,
+            status="pending",
+            series_id=series.id,
+            change_seq=change_seq,
+            updated_at=func.now()
+        )
+        for (start, end), change_seq in zip(occurrences, change_seqs)
+    ]
+    db.add_all(bookings)
+
+    scopes = set()
+    for db_booking in bookings:
+        scopes |= utilization_scopes(db_booking)
+
+    await publish(db, CacheEvent.booking_changed, series_id=series.id, place=booking.place)
+    await refresh_utilization(db, scopes)
+    await db.commit()
+    for db_booking in bookings:
+        await db.refresh(db_booking)
+
+    try:
+        await new_booking_notification(
+            booking_details=series_details(series.id, bookings),
+            status="pending",
+            db=db
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при отправке уведомления о серии бронирований: {e}")
+
+    return series, bookings
+
+
+async def get_series_bookings_db(db: AsyncSession, series_id: int) -> List[booking_model.Booking]:
+    """
+    Возвращает занятия серии по возрастанию дат.
+    """
+    stmt = select(booking_model.Booking).where(
+        booking_model.Booking.series_id == series_id
+    ).order_by(booking_model.Booking.start_date, booking_model.Booking.id)
+
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+async def change_series_status_db(
+    db: AsyncSession,
+    series_id: int,
+    bookings: List[booking_model.Booking],
+    status: str
+) -> List[booking_model.Booking]:
+    """
+    Меняет статус переданных занятий серии одной транзакцией
+    и отправляет одно уведомление.
+    """
+    scopes = set()
+    change_seqs = await next_change_seqs(db, len(bookings))
+    for booking, change_seq in zip(bookings, change_seqs):
+        booking.status = status
+        booking.change_seq = change_seq
+        booking.updated_at = func.now()
+        scopes |= utilization_scopes(booking)
+
+    await publish(db, CacheEvent.booking_changed, series_id=series_id)
+    await refresh_utilization(db, scopes)
+    await db.commit()
+    for booking in bookings:
+        await db.refresh(booking)
+
+    try:
+        await new_booking_notification(
+            booking_details=series_details(series_id, bookings),
+            status=status
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при отправке уведомления о серии бронирований: {e}")
+
+    return bookings
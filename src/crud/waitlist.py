@@ -0,0 +1,151 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from core.cache_bus import CacheEvent, publish
+from core.db_helper import db_helper
+from core.models import booking as booking_model
+from core.occupancy import OverlapIndex
+from core.settings import get_settings
+from core.utils import check_place_capacity
+from crud.analytics import refresh_utilization, utilization_scopes
+from crud.booking import get_approved_intervals_db, lock_change_feed, stamp_change
+from crud.place import get_place, get_places, get_venue_place_names
+from telegram_bot.utils.utils import waitlist_notification
+
+
+def _overlaps(a: booking_model.Booking, b: booking_model.Booking) -> bool:
+    return a.start_date <= b.end_date and a.end_date >= b.start_date
+
+
+async def find_waitlist_candidates(
+    db: AsyncSession,
+    place_name: str,
+    start_date: date,
+    end_date: date
+) -> List[booking_model.Booking]:
+    """
+    Ожидающие заявки площадок той же локации, пересекающиеся с освободившимся
+    периодом, которые теперь проходят по вместимости. Заявки перебираются
+    в порядке подачи; каждая подошедшая учитывается при проверке следующих,
+    так что все кандидаты вместе тоже помещаются.
+    Проверка та же, что в check_place_capacity: люди в заявке плюс все
+    пересекающиеся одобренные бронирования локации не больше вместимости
+    площадки самой заявки. Заявки на площадки без ограничения вместимости
+    места не ждут и не предлагаются.
+    """
+    place = await get_place(db, place_name)
+    if place is None:
+        return []
+
+    all_places = await get_places(db)
+    places = await get_venue_place_names(db, place.venue)
+    booking = booking_model.Booking
+    result = await db.execute(
+        select(booking).where(
+            booking.status == "pending",
+            booking.place.in_(places),
+            booking.start_date <= end_date,
+            booking.end_date >= start_date
+        ).order_by(booking.id).execution_options(populate_existing=True)
+    )
+    pending = result.scalars().all()
+    if not pending:
+        return []
+
+    # Занятость по одобренным считается один раз на весь диапазон заявок
+    existing = await get_approved_intervals_db(
+        db,
+        places,
+        min(b.start_date for b in pending),
+        max(b.end_date for b in pending)
+    )
+    index = OverlapIndex(existing)
+
+    candidates = []
+    for candidate in pending:
+        capacity = all_places[candidate.place].capacity
+        if capacity is None:
+            continue
+        people = (
+            candidate.people_count
+            + index.overlapping_people(candidate.start_date, candidate.end_date)
+            + sum(c.people_count for c in candidates if _overlaps(c, candidate))
+        )
+        if people <= capacity:
+            candidates.append(candidate)
+
+    return candidates
+
+
+def _candidates_details(candidates: List[booking_model.Booking]) -> str:
+    return "\n".join(
+        f"№{b.id}: {b.name or b.theme}, {b.start_date.strftime('%d.%m.%Y')} — "
+        f"{b.end_date.strftime('%d.%m.%Y')}, {b.place}, {b.people_count} чел."
+        for b in candidates
+    )
+
+
+async def process_freed_capacity(
+    place: Optional[str],
+    start_date: date,
+    end_date: date
+) -> List[booking_model.Booking]:
+    """
+    Вызывается после отклонения или удаления одобренного бронирования
+    (или одобренных занятий серии — тогда период охватывает их все)
+    с его площадкой и датами.
+    В зависимости от настройки waitlist.mode предлагает админам подходящие
+    ожидающие заявки или одобряет их одной транзакцией.
+    Работает в своей сессии, чтобы откат не затронул объекты запроса.
+    Ошибки только логируются: основное действие уже выполнено.
+    """
+    mode = get_settings().waitlist.mode
+    if mode == "off" or place is None:
+        return []
+
+    try:
+        async with db_helper.session_factory() as db:
+            if mode == "auto":
+                # Под блокировкой ленты бронирования не меняются до commit:
+                # кандидаты и их вместимость проверяются по актуальным данным
+                await lock_change_feed(db)
+
+            candidates = await find_waitlist_candidates(db, place, start_date, end_date)
+
+            if mode == "auto":
+                approved = []
+                scopes = set()
+                for candidate in candidates:
+                    # Та же проверка, что при ручном одобрении; одобренные ранее
+                    # в этом цикле уже сохранены flush и учитываются
+                    if not await check_place_capacity(db, candidate):
+                        continue
+                    candidate.status = "approved"
+                    await stamp_change(db, candidate)
+                    scopes |= utilization_scopes(candidate)
+                    await db.flush()
+                    approved.append(candidate)
+                candidates = approved
+
+                if candidates:
+                    await publish(db, CacheEvent.booking_changed, place=place)
+                    await refresh_utilization(db, scopes)
+                    await db.commit()
+                    logger.info(f"Из листа ожидания одобрены заявки: {[c.id for c in candidates]}")
+
+            if not candidates:
+                return []
+
+            await waitlist_notification(
+                booking_details=_candidates_details(candidates),
+                approved=mode == "auto",
+                db=db
+            )
+            return candidates
+    except Exception as e:
+        logger.error(f"Ошибка при обработке листа ожидания: {e}")
+        return []
@@ -55,7 +55,8 @@ CREATE TABLE public.bookings (
     curator_fio text,
     curator_position text,
     curator_contact text,
-    other_info text
+    other_info text,
+    comment_count integer DEFAULT 0 NOT NULL
 );
 
 
@@ -137,5 +138,249 @@ CREATE INDEX idx_bookings_status ON public.bookings USING btree (status);
 
 CREATE INDEX idx_bookings_user_id ON public.bookings USING btree (user_id);
 
+CREATE INDEX idx_comments_booking_id ON public.comments USING btree (booking_id, id);
+
 ALTER TABLE ONLY public.comments
     ADD CONSTRAINT comments_booking_fk FOREIGN KEY (booking_id) REFERENCES public.bookings(id) NOT VALID;
+
+
+CREATE TABLE public.utilization_daily (
+    place text NOT NULL,
+    type text NOT NULL,
+    day date NOT NULL,
+    people integer NOT NULL
+);
+
+
+ALTER TABLE public.utilization_daily OWNER TO postgres;
+
+CREATE TABLE public.utilization_monthly (
+    place text NOT NULL,
+    type text NOT NULL,
+    month date NOT NULL,
+    person_days bigint DEFAULT 0 NOT NULL,
+    peak_people integer DEFAULT 0 NOT NULL,
+    peak_day date,
+    approved_count integer DEFAULT 0 NOT NULL,
+    rejected_count integer DEFAULT 0 NOT NULL,
+    pending_count integer DEFAULT 0 NOT NULL
+);
+
+
+ALTER TABLE public.utilization_monthly OWNER TO postgres;
+
+ALTER TABLE ONLY public.utilization_daily
+    ADD CONSTRAINT utilization_daily_pkey PRIMARY KEY (place, type, day);
+
+ALTER TABLE ONLY public.utilization_monthly
+    ADD CONSTRAINT utilization_monthly_pkey PRIMARY KEY (place, type, month);
+
+CREATE INDEX idx_utilization_monthly_month ON public.utilization_monthly USING btree (month);
+
+CREATE INDEX idx_bookings_place_type_start ON public.bookings USING btree ((COALESCE(place, ''::text)), (COALESCE(type, ''::text)), start_date);
+
+CREATE TABLE public.places (
+    id integer NOT NULL,
+    name text NOT NULL,
+    venue text NOT NULL,
+    capacity integer
+);
+
+
+ALTER TABLE public.places OWNER TO postgres;
+
+CREATE SEQUENCE public.places_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER TABLE public.places_id_seq OWNER TO postgres;
+
+ALTER SEQUENCE public.places_id_seq OWNED BY public.places.id;
+
+ALTER TABLE ONLY public.places ALTER COLUMN id SET DEFAULT nextval('public.places_id_seq'::regclass);
+
+ALTER TABLE ONLY public.places
+    ADD CONSTRAINT places_pkey PRIMARY KEY (id);
+
+ALTER TABLE ONLY public.places
+    ADD CONSTRAINT places_name_key UNIQUE (name);
+
+INSERT INTO public.places (name, venue, capacity) VALUES
+    ('Офлайн Счастливцево', 'Счастливцево', 400),
+    ('Офлайн Счастливцево и иная площадка', 'Счастливцево', 400);
+
+CREATE INDEX idx_bookings_approved_place_dates ON public.bookings USING btree (place, start_date, end_date) WHERE ((status)::text = 'approved'::text);
+
+CREATE FUNCTION public.notify_cache_event() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    PERFORM pg_notify('schedule_cache', json_build_object('event', TG_ARGV[0])::text);
+    RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION public.notify_cache_event() OWNER TO postgres;
+
+CREATE TRIGGER admins_cache_notify AFTER INSERT OR DELETE OR UPDATE OR TRUNCATE ON public.admins FOR EACH STATEMENT EXECUTE FUNCTION public.notify_cache_event('admins_changed');
+
+CREATE TRIGGER places_cache_notify AFTER INSERT OR DELETE OR UPDATE OR TRUNCATE ON public.places FOR EACH STATEMENT EXECUTE FUNCTION public.notify_cache_event('places_changed');
+
+CREATE SEQUENCE public.bookings_change_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER TABLE public.bookings_change_seq OWNER TO postgres;
+
+ALTER TABLE public.bookings ADD COLUMN change_seq bigint DEFAULT nextval('public.bookings_change_seq'::regclass);
+
+ALTER TABLE public.bookings ADD COLUMN updated_at timestamp with time zone DEFAULT now();
+
+CREATE INDEX idx_bookings_change_seq ON public.bookings USING btree (change_seq);
+
+CREATE INDEX idx_bookings_user_change_seq ON public.bookings USING btree (user_id, change_seq);
+
+CREATE TABLE public.booking_tombstones (
+    booking_id integer NOT NULL,
+    user_id bigint,
+    change_seq bigint NOT NULL,
+    deleted_at timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+ALTER TABLE public.booking_tombstones OWNER TO postgres;
+
+ALTER TABLE ONLY public.booking_tombstones
+    ADD CONSTRAINT booking_tombstones_pkey PRIMARY KEY (booking_id);
+
+CREATE INDEX idx_booking_tombstones_change_seq ON public.booking_tombstones USING btree (change_seq);
+
+CREATE INDEX idx_booking_tombstones_user_change_seq ON public.booking_tombstones USING btree (user_id, change_seq);
+
+CREATE TABLE public.bookings_archive (
+    LIKE public.bookings,
+    archived_at timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+ALTER TABLE public.bookings_archive OWNER TO postgres;
+
+ALTER TABLE ONLY public.bookings_archive
+    ADD CONSTRAINT bookings_archive_pkey PRIMARY KEY (id);
+
+CREATE INDEX idx_bookings_archive_place_type_start ON public.bookings_archive USING btree ((COALESCE(place, ''::text)), (COALESCE(type, ''::text)), start_date);
+
+CREATE INDEX idx_bookings_archive_user_id ON public.bookings_archive USING btree (user_id);
+
+CREATE TABLE public.comments_archive (
+    LIKE public.comments,
+    archived_at timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+ALTER TABLE public.comments_archive OWNER TO postgres;
+
+ALTER TABLE ONLY public.comments_archive
+    ADD CONSTRAINT comments_archive_pkey PRIMARY KEY (id);
+
+CREATE INDEX idx_comments_archive_booking_id ON public.comments_archive USING btree (booking_id, id);
+
+CREATE INDEX idx_bookings_end_date ON public.bookings USING btree (end_date);
+
+CREATE TABLE public.booking_series (
+    id integer NOT NULL,
+    user_id bigint,
+    freq character varying(20) NOT NULL,
+    "interval" integer DEFAULT 1 NOT NULL,
+    occurrences integer NOT NULL,
+    created_at timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+ALTER TABLE public.booking_series OWNER TO postgres;
+
+CREATE SEQUENCE public.booking_series_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER TABLE public.booking_series_id_seq OWNER TO postgres;
+
+ALTER SEQUENCE public.booking_series_id_seq OWNED BY public.booking_series.id;
+
+ALTER TABLE ONLY public.booking_series ALTER COLUMN id SET DEFAULT nextval('public.booking_series_id_seq'::regclass);
+
+ALTER TABLE ONLY public.booking_series
+    ADD CONSTRAINT booking_series_pkey PRIMARY KEY (id);
+
+ALTER TABLE public.bookings ADD COLUMN series_id integer;
+
+ALTER TABLE ONLY public.bookings
+    ADD CONSTRAINT bookings_series_id_fkey FOREIGN KEY (series_id) REFERENCES public.booking_series(id) ON DELETE SET NULL;
+
+CREATE INDEX idx_bookings_series_id ON public.bookings USING btree (series_id);
+
+ALTER TABLE public.bookings_archive ADD COLUMN series_id integer;
+
+CREATE TABLE public.scheduler_runs (
+    job character varying(50) NOT NULL,
+    run_date date NOT NULL,
+    started_at timestamp with time zone DEFAULT now() NOT NULL,
+    finished_at timestamp with time zone
+);
+
+
+ALTER TABLE public.scheduler_runs OWNER TO postgres;
+
+ALTER TABLE ONLY public.scheduler_runs
+    ADD CONSTRAINT scheduler_runs_pkey PRIMARY KEY (job, run_date);
+
+CREATE INDEX idx_bookings_approved_start_date ON public.bookings USING btree (start_date) WHERE ((status)::text = 'approved'::text);
+
+CREATE INDEX idx_bookings_pending_id ON public.bookings USING btree (id) WHERE ((status)::text = 'pending'::text);
+
+CREATE TABLE public.idempotency_keys (
+    user_id bigint NOT NULL,
+    key character varying(255) NOT NULL,
+    fingerprint character varying(64) NOT NULL,
+    status_code integer,
+    response bytea,
+    created_at timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+ALTER TABLE public.idempotency_keys OWNER TO postgres;
+
+ALTER TABLE ONLY public.idempotency_keys
+    ADD CONSTRAINT idempotency_keys_pkey PRIMARY KEY (user_id, key);
+
+CREATE INDEX idx_idempotency_keys_created_at ON public.idempotency_keys USING btree (created_at);
+
+CREATE TABLE public.calendar_feed_tokens (
+    user_id bigint NOT NULL,
+    token character varying(64) NOT NULL,
+    created_at timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+ALTER TABLE public.calendar_feed_tokens OWNER TO postgres;
+
+ALTER TABLE ONLY public.calendar_feed_tokens
+    ADD CONSTRAINT calendar_feed_tokens_pkey PRIMARY KEY (user_id);
+
+ALTER TABLE ONLY public.calendar_feed_tokens
+    ADD CONSTRAINT calendar_feed_tokens_token_key UNIQUE (token);
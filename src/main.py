@@ -3,50 +3,132 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from dotenv import load_dotenv
 
-from core.settings import settings
+from core.archive import BookingArchiver
+from core.cache_bus import CacheBusListener
+from core.db_helper import db_helper
+from core.lifecycle import DrainingServer, lifecycle
+from core.profiling import ProfilingMiddleware, TelegramTimingMiddleware, install_db_timing
+from core.settings import get_settings
 from fastapi.middleware.cors import CORSMiddleware
 
 from api import router as api_router
+from telegram_bot.config.config import close_bot, get_bot
+from telegram_bot.dispatcher import get_dispatcher, wait_pending_updates
+from telegram_bot.scheduler import Scheduler
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("🚀 Приложение запускается...")
+    # Переменные окружения для бота и уведомлений читаются один раз здесь
+    load_dotenv()
+    settings = get_settings()
+    db_helper.setup()
+
+    cache_bus = None
+    if settings.cache_bus.enabled:
+        cache_bus = CacheBusListener(str(settings.db.url))
+        await cache_bus.start()
+
+    # Соединения и кэши прогреваются до приема трафика; если БД недоступна,
+    # воркер запускается неготовым и прогреется на /health/ready
+    lifecycle.warmed = False
+    lifecycle.draining = False
+    await lifecycle.warm_up()
+
+    archiver = None
+    if settings.archive.enabled:
+        archiver = BookingArchiver(settings.archive)
+        await archiver.start()
+
+    scheduler = None
+    if settings.scheduler.enabled:
+        scheduler = Scheduler(settings.scheduler)
+        await scheduler.start()
+
+    if settings.profiling.enabled:
+        get_bot().session.middleware(TelegramTimingMiddleware())
+
+    if settings.telegram.webhook_enabled:
+        dp = get_dispatcher()
+        await get_bot().set_webhook(
+            url=settings.telegram.webhook_url,
+            secret_token=settings.telegram.webhook_secret,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+
     yield
+
     print("🛑 Приложение выключается...")
+    # К этому моменту uvicorn уже закрыл порт и дождался запросов в обработке
+    lifecycle.draining = True
+    await wait_pending_updates()
+    if scheduler is not None:
+        await scheduler.stop()
+    if archiver is not None:
+        await archiver.stop()
+    if cache_bus is not None:
+        await cache_bus.stop()
+    await close_bot()
+    await db_helper.dispose()
+
 
+def create_app() -> FastAPI:
+    """
+    Фабрика приложения. Не открывает соединений и не создает бота:
+    все ресурсы создаются в lifespan или при первом обращении.
+    """
+    app = FastAPI(
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
+        title="""Расписание Таврида""",
+        version="1.0.0"
+    )
 
-app = FastAPI(
-    default_response_class=ORJSONResponse,
-    lifespan=lifespan,
-    title="""Расписание Таврида""",
-    version="1.0.0"
-)
+    # origins = [
+    #     "http://localhost:3000",
+    # ]
 
-# origins = [
-#     "http://localhost:3000",
-# ]
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    # Профилирование подключается только явно: выключенное не стоит ничего
+    profiling = get_settings().profiling
+    if profiling.enabled:
+        install_db_timing()
+        app.add_middleware(ProfilingMiddleware, config=profiling)
 
+    app.include_router(
+        api_router,
+        prefix="/api"
+    )
 
-app.include_router(
-    api_router,
-    prefix="/api"
-)
+    return app
 
 
 if __name__=="__main__":
-    uvicorn.run(
-        "main:app",
-        host=settings.run.host,
-        port=settings.run.port,
-        reload=True
-    )
+    settings = get_settings()
+    if settings.run.reload:
+        uvicorn.run(
+            "main:create_app",
+            factory=True,
+            host=settings.run.host,
+            port=settings.run.port,
+            reload=True
+        )
+    else:
+        config = uvicorn.Config(
+            "main:create_app",
+            factory=True,
+            host=settings.run.host,
+            port=settings.run.port,
+            timeout_graceful_shutdown=settings.run.drain_timeout
+        )
+        DrainingServer(config, lifecycle, settings.run.drain_delay).run()
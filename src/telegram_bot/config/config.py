@@ -1,9 +1,6 @@
 from dataclasses import dataclass
 from environs import Env
 from typing import Optional
-from aiogram import Bot
-from aiogram.enums import ParseMode
-from aiogram.client.bot import DefaultBotProperties
 
 
 @dataclass
@@ -17,13 +14,7 @@ class Config:
     tg_bot: TgBot
 
 
-env: Env = Env()
-
-env.read_env()
-
-# Глобальная переменная для хранения экземпляра бота
-
-def load_config(path) -> Config:
+def load_config(path: Optional[str] = None) -> Config:
 
     env: Env = Env()
     env.read_env(path)
@@ -35,5 +26,37 @@ def load_config(path) -> Config:
         )
     )
 
-config: Config = load_config(".env")
-bot = Bot(token=config.tg_bot.token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+
+# Экземпляр бота создается при первом обращении: импорт aiogram и чтение
+# .env заметно замедляют старт процесса, а боту они нужны не сразу.
+_bot = None
+
+
+def get_bot():
+    """
+    Возвращает общий для процесса экземпляр бота, создавая его при необходимости.
+    """
+    global _bot
+
+    if _bot is None:
+        from aiogram import Bot
+        from aiogram.enums import ParseMode
+        from aiogram.client.bot import DefaultBotProperties
+
+        config = load_config(".env")
+        _bot = Bot(token=config.tg_bot.token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+
+    return _bot
+
+
+async def close_bot() -> None:
+    """
+    Закрывает HTTP-сессию бота, если он был создан.
+    """
+    global _bot
+
+    if _bot is None:
+        return
+
+    await _bot.session.close()
+    _bot = None
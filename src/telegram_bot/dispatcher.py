@@ -0,0 +1,56 @@
+import asyncio
+from typing import Set
+
+from loguru import logger
+
+
+# Диспетчер для режима webhook: работает внутри процесса API
+# и использует тот же экземпляр бота, что и уведомления.
+_dispatcher = None
+_pending: Set[asyncio.Task] = set()
+
+
+def get_dispatcher():
+    """
+    Возвращает диспетчер с подключенными обработчиками бота.
+    """
+    global _dispatcher
+
+    if _dispatcher is None:
+        from aiogram import Dispatcher
+        from telegram_bot.handlers import handlers
+
+        _dispatcher = Dispatcher()
+        _dispatcher.include_router(handlers.router)
+
+    return _dispatcher
+
+
+def process_update(bot, update) -> None:
+    """
+    Обрабатывает обновление в фоне, чтобы сразу ответить Telegram.
+    """
+    task = asyncio.create_task(get_dispatcher().feed_update(bot, update))
+    _pending.add(task)
+    task.add_done_callback(_update_done)
+
+
+def _update_done(task: asyncio.Task) -> None:
+    _pending.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.opt(exception=error).error(f"Ошибка при обработке обновления Telegram: {error}")
+
+
+async def wait_pending_updates(timeout: float = 10) -> None:
+    """
+    Дожидается обработки уже полученных обновлений перед остановкой.
+    """
+    if not _pending:
+        return
+
+    _, not_done = await asyncio.wait(set(_pending), timeout=timeout)
+    if not_done:
+        logger.warning(f"Не дождались обработки {len(not_done)} обновлений Telegram")
@@ -1,8 +1,15 @@
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message, WebAppInfo, FSInputFile
 from aiogram import Router
 from aiogram.filters import Command
 from pathlib import Path
 
+try:
+    from telegram_bot.utils.file_cache import content_hash, file_id_cache
+except ImportError:
+    # Бот запущен отдельным процессом из папки telegram_bot
+    from utils.file_cache import content_hash, file_id_cache
+
 
 router = Router()
 
@@ -10,6 +17,8 @@ GREETING_MESSAGE = """👋 Добро пожаловать!\n
 Это сервис бронирования площадок на Тавриде.\n
 Пожалуйста, нажмите кнопку ниже, чтобы перейти в мини-приложение и оформить бронирование."""
 
+GREETING_IMAGE_PATH = Path(__file__).parent.parent / "tavrida.png"
+
 keyboard = InlineKeyboardMarkup(
     inline_keyboard=[
         [InlineKeyboardButton(
@@ -19,16 +28,40 @@ keyboard = InlineKeyboardMarkup(
     ]
 )
 
+_greeting_image_key = None
+
+
+def get_greeting_image_key() -> str:
+    """Ключ картинки приветствия в кэше file_id (хэш содержимого файла)."""
+    global _greeting_image_key
+
+    if _greeting_image_key is None:
+        _greeting_image_key = "photo:" + content_hash(GREETING_IMAGE_PATH.read_bytes())
+
+    return _greeting_image_key
+
 
 @router.message(Command(commands='start'))
 async def process_start_command(message: Message):
     """Обработчик команды /start."""
-    # Получаем путь к изображению
-    image_path = Path(__file__).parent.parent / "tavrida.png"
-    photo = FSInputFile(image_path)
-    
-    await message.answer_photo(
-        photo=photo,
+    key = get_greeting_image_key()
+    file_id = file_id_cache.get(key)
+
+    # Картинка уже загружена в Telegram — отправляем по file_id
+    if file_id:
+        try:
+            await message.answer_photo(
+                photo=file_id,
+                caption=GREETING_MESSAGE,
+                reply_markup=keyboard
+            )
+            return
+        except TelegramBadRequest:
+            file_id_cache.discard(key)
+
+    sent = await message.answer_photo(
+        photo=FSInputFile(GREETING_IMAGE_PATH),
         caption=GREETING_MESSAGE,
         reply_markup=keyboard
     )
+    file_id_cache.set(key, sent.photo[-1].file_id)
@@ -1,7 +1,8 @@
 import logging
 import asyncio
+import os
 from aiogram import Dispatcher
-from config.config import Config, load_config, bot
+from config.config import close_bot, get_bot
 from handlers import handlers
 
 
@@ -9,12 +10,18 @@ logging.basicConfig(level=logging.INFO)
 
 
 async def main() -> None:
+    # В режиме webhook обновления принимает API; polling с установленным
+    # webhook Telegram все равно не разрешит
+    if os.getenv("CONFIG__TELEGRAM__WEBHOOK_ENABLED", "").lower() in ("1", "true", "yes", "on"):
+        logging.info("Включен режим webhook, polling не запускается")
+        return
+
     try:
         dp = Dispatcher()
         dp.include_router(handlers.router)
-        await dp.start_polling(bot)
+        await dp.start_polling(get_bot())
     finally:
-        await bot.session.close()
+        await close_bot()
 
 
 if __name__ == "__main__":
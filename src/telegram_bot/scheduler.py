@@ -0,0 +1,189 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, List
+from zoneinfo import ZoneInfo
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db_helper import db_helper
+from core.settings import SchedulerConfig
+from crud.admin import get_all_admin_user_ids
+from crud.scheduler import (
+    claim_job_run_db,
+    finish_job_run_db,
+    get_bookings_starting_db,
+    get_pending_bookings_db,
+    is_job_run_finished_db,
+    release_job_run_db,
+)
+from telegram_bot.utils.utils import send_messages, split_message
+
+
+# Через сколько незавершенную задачу (воркер упал во время нее) можно запустить снова
+JOB_CLAIM_TIMEOUT = timedelta(hours=1)
+
+# Пауза перед повтором задачи, завершившейся ошибкой
+JOB_RETRY_DELAY = 600
+
+# Как часто проверять задачу, которую выполняет другой воркер:
+# если он остановится, не закончив, задачу подхватит этот
+JOB_RECHECK_INTERVAL = 300
+
+
+def _booking_line(booking) -> str:
+    return (
+        f"№{booking.id}: {booking.name or booking.theme}, "
+        f"{booking.start_date.strftime('%d.%m.%Y')} — {booking.end_date.strftime('%d.%m.%Y')}, "
+        f"{booking.place or '-'}, {booking.people_count} чел."
+    )
+
+
+async def send_reminders(db: AsyncSession, today: date) -> None:
+    """
+    Напоминания о мероприятиях, начинающихся завтра: автору заявки —
+    о его мероприятии, админам — одна сводка по всем.
+    """
+    tomorrow = today + timedelta(days=1)
+    bookings = await get_bookings_starting_db(db, tomorrow)
+    if not bookings:
+        return
+
+    messages = [
+        (
+            booking.user_id,
+            "⏰ <b>Завтра начинается ваше мероприятие!</b>\n\n" + _booking_line(booking)
+        )
+        for booking in bookings
+        if booking.user_id
+    ]
+
+    admin_ids = await get_all_admin_user_ids(db)
+    # Дальше только отправка с ограничением частоты: соединение возвращается в пул
+    await db.commit()
+
+    summary = split_message(
+        f"⏰ <b>Завтра, {tomorrow.strftime('%d.%m.%Y')}, начинаются мероприятия ({len(bookings)}):</b>\n",
+        (_booking_line(booking) for booking in bookings)
+    )
+    for admin_id in admin_ids:
+        messages += [(admin_id, text) for text in summary]
+
+    sent = await send_messages(messages)
+    logger.info(f"Напоминания на {tomorrow}: мероприятий {len(bookings)}, отправлено сообщений {sent}")
+
+
+async def send_pending_digest(db: AsyncSession, today: date) -> None:
+    """
+    Ежедневная сводка админам по заявкам, ожидающим рассмотрения.
+    """
+    pending = await get_pending_bookings_db(db)
+    if not pending:
+        return
+
+    digest = split_message(
+        f"🔔 <b>Заявки на рассмотрении ({len(pending)}):</b>\n",
+        (_booking_line(booking) for booking in pending)
+    )
+    admin_ids = await get_all_admin_user_ids(db)
+    # Дальше только отправка с ограничением частоты: соединение возвращается в пул
+    await db.commit()
+
+    messages = [
+        (admin_id, text)
+        for admin_id in admin_ids
+        for text in digest
+    ]
+
+    sent = await send_messages(messages)
+    logger.info(f"Сводка заявок: ожидают {len(pending)}, отправлено сообщений {sent}")
+
+
+@dataclass
+class DailyJob:
+    name: str
+    hour: int
+    run: Callable[[AsyncSession, date], Awaitable[None]]
+
+
+class Scheduler:
+    """
+    Ежедневные задачи бота. Работает в каждом воркере API, но каждая задача
+    выполняется один раз в день: перед запуском воркер записывает отметку
+    в scheduler_runs, и запускает задачу только тот, кому это удалось.
+    Выполненной задача считается только после успешного завершения:
+    при ошибке или остановке воркера отметка снимается, и задача повторяется
+    через JOB_RETRY_DELAY или при старте следующего воркера. Пока задачу
+    выполняет другой воркер, этот проверяет ее каждые JOB_RECHECK_INTERVAL
+    секунд и подхватывает, если та так и не завершилась.
+    Если в назначенный час процесс не работал, задача выполнится при старте.
+    """
+
+    def __init__(self, config: SchedulerConfig) -> None:
+        self._tz = ZoneInfo(config.timezone)
+        self._jobs = [
+            DailyJob("reminders", config.reminders_hour, send_reminders),
+            DailyJob("pending_digest", config.digest_hour, send_pending_digest),
+        ]
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._loop(job)) for job in self._jobs]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_job(self, job: DailyJob, day: date) -> bool:
+        """
+        Выполняет задачу за день, если ее еще никто не выполнил.
+        Возвращает False, пока задачу выполняет другой воркер.
+        """
+        async with db_helper.session_factory() as session:
+            if not await claim_job_run_db(session, job.name, day, JOB_CLAIM_TIMEOUT):
+                return await is_job_run_finished_db(session, job.name, day)
+
+            try:
+                await job.run(session, day)
+            except BaseException:
+                # И при ошибке, и при отмене (остановка воркера) задача
+                # не выполнена: отметка снимается, чтобы ее не ждали час
+                await self._release(job, day)
+                raise
+
+            await finish_job_run_db(session, job.name, day)
+            return True
+
+    async def _release(self, job: DailyJob, day: date) -> None:
+        # Отдельная сессия: сессия задачи могла остаться в ошибочной транзакции
+        try:
+            async with db_helper.session_factory() as session:
+                await release_job_run_db(session, job.name, day)
+        except Exception as e:
+            logger.error(f"Не удалось снять отметку задачи планировщика {job.name}: {e}")
+
+    async def _loop(self, job: DailyJob) -> None:
+        while True:
+            now = datetime.now(self._tz)
+            target = now.replace(hour=job.hour, minute=0, second=0, microsecond=0)
+
+            if now >= target:
+                try:
+                    finished = await self.run_job(job, now.date())
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Ошибка в задаче планировщика {job.name}: {e}")
+                    await asyncio.sleep(JOB_RETRY_DELAY)
+                    continue
+
+                if not finished:
+                    await asyncio.sleep(JOB_RECHECK_INTERVAL)
+                    continue
+                target += timedelta(days=1)
+
+            await asyncio.sleep((target - datetime.now(self._tz)).total_seconds())
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Модуль не зависит от core: его используют и API, и отдельный процесс бота.
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "file_ids.json"
+
+MAX_ENTRIES = 1000
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileIdCache:
+    """
+    Постоянный кэш "ключ содержимого -> file_id Telegram".
+    Файл, уже загруженный в Telegram, можно отправить повторно по file_id,
+    не передавая его содержимое. Кэш хранится в JSON-файле и общий
+    для всех процессов, которые видят этот файл.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self._path = path
+        self._data: Optional[Dict[str, str]] = None
+
+    @property
+    def path(self) -> Path:
+        # Путь читается при первом обращении, когда окружение уже загружено
+        if self._path is None:
+            self._path = Path(os.getenv("TELEGRAM_FILE_CACHE_PATH", DEFAULT_CACHE_PATH))
+        return self._path
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self) -> None:
+        # Свое имя временного файла на каждую запись: одновременные записи
+        # из разных потоков и процессов не мешают друг другу
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.path.parent,
+            prefix=self.path.name + ".", suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = Path(f.name)
+            try:
+                json.dump(self._data, f)
+            except BaseException:
+                f.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> Optional[str]:
+        if self._data is None:
+            self._data = self._read()
+        return self._data.get(key)
+
+    def set(self, key: str, file_id: str) -> None:
+        # Перечитываем файл, чтобы не затереть записи других процессов
+        self._data = self._read()
+        self._data.pop(key, None)
+        self._data[key] = file_id
+
+        while len(self._data) > MAX_ENTRIES:
+            self._data.pop(next(iter(self._data)))
+
+        self._write()
+
+    def discard(self, key: str) -> None:
+        self._data = self._read()
+        if self._data.pop(key, None) is not None:
+            self._write()
+
+
+file_id_cache = FileIdCache()
@@ -1,34 +1,66 @@
+import asyncio
 import os
-from dotenv import load_dotenv
-from typing import Union
-from aiogram.types import BufferedInputFile
+from typing import Iterable, List, Optional, Tuple, Union
 from io import BytesIO
+from loguru import logger
 from core.db_helper import db_helper
 from crud.admin import get_all_admin_user_ids
-from telegram_bot.config.config import bot
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
+from telegram_bot.config.config import get_bot
+from telegram_bot.utils.file_cache import content_hash, file_id_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-load_dotenv()
-
 db = db_helper.session_getter
 
+# Telegram допускает около 30 сообщений в секунду в разные чаты
+SEND_RATE = 25
+MESSAGE_LIMIT = 4096
+
+
+async def send_cached_excel_file(user_id: int, content_key: str) -> bool:
+    """
+    Пересылает ранее загруженный файл по file_id. Возвращает False, если файла
+    с таким ключом содержимого еще не отправляли (или Telegram его больше не знает).
+    """
+    from aiogram.exceptions import TelegramBadRequest
+
+    key = "document:" + content_key
+    file_id = file_id_cache.get(key)
+    if not file_id:
+        return False
+
+    try:
+        await get_bot().send_document(
+            chat_id=user_id,
+            document=file_id,
+            caption="Ваш файл с расписанием 📊"
+        )
+        return True
+    except TelegramBadRequest:
+        file_id_cache.discard(key)
+        return False
+
 
 async def send_excel_file(
     user_id: int,
     file: Union[BytesIO, bytes],
-    filename: str
+    filename: str,
+    content_key: Optional[str] = None
 ) -> None:
     """
     Отправляет Excel файл пользователю в Telegram.
+    Если такой же файл уже отправлялся, он пересылается по file_id без повторной загрузки.
 
     Args:
-        bot: Экземпляр бота
         user_id: ID пользователя в Telegram
         file: Файл в формате BytesIO или bytes
         filename: Имя файла с расширением .xlsx
+        content_key: Ключ содержимого для кэша file_id. По умолчанию — хэш байтов файла
     """
+    from aiogram.types import BufferedInputFile
+
+    bot = get_bot()
+
     # Если файл передан как bytes, конвертируем его в BytesIO
     if isinstance(file, bytes):
         file_obj = BytesIO(file)
@@ -37,19 +69,28 @@ async def send_excel_file(
     
     # Убеждаемся, что указатель находится в начале файла
     file_obj.seek(0)
+    data = file_obj.getvalue()
+
+    content_key = content_key or content_hash(data)
+    if await send_cached_excel_file(user_id, content_key):
+        return
+
+    key = "document:" + content_key
     
     # Преобразуем BytesIO в BufferedInputFile
     input_file = BufferedInputFile(
-        file_obj.getvalue(),
+        data,
         filename=filename
     )
     
     # Отправляем файл пользователю
-    await bot.send_document(
+    sent = await bot.send_document(
         chat_id=user_id,
         document=input_file,
         caption="Ваш файл с расписанием 📊"
     )
+    file_id_cache.set(key, sent.document.file_id)
+
 
 async def new_booking_notification(
     booking_details: str,
@@ -59,6 +100,9 @@ async def new_booking_notification(
     """
     Отправляет уведомление о новой брони пользователю в Telegram с инлайн-кнопкой на мини-приложение.
     """
+    from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+    bot = get_bot()
     keyboard = InlineKeyboardMarkup(
             inline_keyboard=[[
                 InlineKeyboardButton(
@@ -108,3 +152,76 @@ async def new_booking_notification(
                 parse_mode="HTML",
                 reply_markup=keyboard
             )
+
+
+async def waitlist_notification(
+    booking_details: str,
+    approved: bool,
+    db: AsyncSession = None
+) -> None:
+    """
+    Сообщает об освободившемся месте: автоматически одобренные заявки —
+    в общий чат уведомлений, предложенные к одобрению — админам.
+    """
+    bot = get_bot()
+
+    if approved:
+        await bot.send_message(
+            chat_id=os.getenv("NOTIFICATIONS_CHAT_ID"),
+            text=(
+                "✅ <b>Освободилось место, заявки из очереди одобрены автоматически!</b>\n\n"
+                f"<b>Детали:</b>\n{booking_details}"
+            ),
+            parse_mode="HTML"
+        )
+        return
+
+    message = (
+        "🔁 <b>Освободилось место, эти заявки теперь можно одобрить:</b>\n\n"
+        f"{booking_details}"
+    )
+    for chat_id in await get_all_admin_user_ids(db=db):
+        await bot.send_message(chat_id=chat_id, text=message, parse_mode="HTML")
+
+
+def split_message(header: str, lines: Iterable[str], limit: int = MESSAGE_LIMIT) -> List[str]:
+    """
+    Собирает сообщения из заголовка и строк, не превышая лимит длины Telegram.
+    Заголовок повторяется только в первом сообщении.
+    """
+    messages = []
+    current = header
+    for line in lines:
+        if len(current) + len(line) + 1 > limit:
+            messages.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
+
+
+async def send_messages(messages: Iterable[Tuple[Union[int, str], str]], rate: float = SEND_RATE) -> int:
+    """
+    Отправляет сообщения (chat_id, текст) с ограничением скорости.
+    При RetryAfter ждет, сколько просит Telegram, и повторяет отправку;
+    остальные ошибки (например, пользователь заблокировал бота) только логируются.
+    Возвращает число отправленных сообщений.
+    """
+    from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+
+    bot = get_bot()
+    sent = 0
+    for chat_id, text in messages:
+        for _ in range(3):
+            try:
+                await bot.send_message(chat_id=chat_id, text=text, parse_mode="HTML")
+                sent += 1
+                break
+            except TelegramRetryAfter as e:
+                await asyncio.sleep(e.retry_after)
+            except TelegramAPIError as e:
+                logger.warning(f"Не удалось отправить сообщение в чат {chat_id}: {e}")
+                break
+        await asyncio.sleep(1 / rate)
+    return sent